@@ -0,0 +1,91 @@
+"""Check SimpleCrew's task order and context, and count its LLM calls, offline.
+
+Runs a kickoff against the Bedrock Converse stub. Every stub answer is a final
+answer carrying a unique marker, so the checks are:
+
+- the tasks actually ran in dependency order: weather_task finished before
+  fashion_task's first model call (crewAI 0.102 has no task events, so each
+  task's ``callback`` records how many requests had reached the stub when it
+  finished);
+- fashion_task's prompt contains weather_task's output, i.e. the context link
+  passes the weather result on;
+- one model call per task (anything more is a wasted step);
+- a second kickoff through a response cache does not reach the stub at all;
+- ``dependency_ordered`` keeps an ``async_execution`` set in tasks.yaml.
+
+    python benchmarks/count_llm_calls.py
+"""
+import itertools
+import json
+import os
+import tempfile
+
+from travel_core.bedrock import BedrockSettings, BedrockTransport
+from travel_core.bedrock_stub import running_stub
+from travel_core.llm_cache import ResponseCache
+
+
+def main():
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "stub")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "stub")
+
+    from crewai import Task
+    from crewai_tools.crew import SimpleCrew, dependency_ordered
+    from crewai_tools.llm import BedrockLLM
+    from crewai_tools.main import travel_query
+
+    finished, outputs = {}, {}
+
+    def record(stub, crew):
+        for task in crew.tasks:
+            def callback(output, name=task.name):
+                finished[name] = stub.requests
+                outputs[name] = output.raw
+            task.callback = callback
+        return crew
+
+    answers = itertools.count(1)
+
+    def reply(request):
+        return f"Thought: I now can give a great answer\nFinal Answer: stub-answer-{next(answers)}"
+
+    with running_stub(reply=reply) as stub, tempfile.TemporaryDirectory() as tmp:
+        transport = BedrockTransport(BedrockSettings(endpoint_url=stub.url, max_attempts=1))
+        cache = ResponseCache(os.path.join(tmp, "llm_cache.sqlite"))
+        SimpleCrew.llm = BedrockLLM(model="bedrock/us.amazon.nova-lite-v1:0", transport=transport, cache=cache)
+        crew = record(stub, SimpleCrew().crew())
+        crew.kickoff(inputs=travel_query("Paris"))
+        calls, requests = transport.metrics.calls, stub.requests
+        prompts = [json.dumps(request, ensure_ascii=False) for request in stub.transcript]
+        first_run = dict(finished)
+
+        # Same query again: every model call should be answered by the cache
+        SimpleCrew().crew().kickoff(inputs=travel_query("Paris"))
+        cached_requests = stub.requests - requests
+        cache_stats = cache.stats()
+        cache.close()
+
+    print(f"requests at task completion: {first_run}")
+    print(f"LLM calls: {calls} for {len(crew.tasks)} tasks ({requests} requests reached the stub)")
+    print(f"cached kickoff: {cached_requests} requests reached the stub; cache {cache_stats}")
+    weather_output = outputs["weather_task"]
+    fashion_calls = [n for n, prompt in enumerate(prompts, 1) if "and call get_fashion tool" in prompt]
+    assert fashion_calls, "no model call was made for fashion_task"
+    assert first_run["weather_task"] < fashion_calls[0], "fashion_task started before weather_task finished"
+    fashion_prompts = [prompts[n - 1] for n in fashion_calls]
+    assert all(weather_output in prompt for prompt in fashion_prompts), \
+        "fashion_task's prompt does not contain weather_task's output"
+    assert calls == len(crew.tasks), "a kickoff should cost one LLM call per task"
+    assert cached_requests == 0, "a repeated kickoff should be served from the response cache"
+
+    # An explicit tasks.yaml value survives; an unset one is filled in per layer
+    config = SimpleCrew().tasks_config
+    pinned = Task(config={**config["weather_task"], "async_execution": True})
+    unset = Task(config=config["weather_task"])
+    dependency_ordered([unset, pinned])
+    assert (unset.async_execution, pinned.async_execution) == (True, True), \
+        "dependency_ordered overrode async_execution from tasks.yaml"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Cold-start benchmark for ``crewai_tools.main``.
+
+Imports the module in fresh interpreters with ``-X importtime`` and reports the
+median wall-clock import time, the slowest modules, and whether any heavy
+dependency (crewAI, litellm, boto3) was loaded before the first kickoff.
+
+    python benchmarks/importtime.py --runs 5 --module crewai_tools.main
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY = ("crewai", "litellm", "boto3", "botocore")
+PROBE = (
+    "import importlib, json, sys; importlib.import_module({module!r}); "
+    "print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+)
+
+
+def parse_importtime(stderr):
+    """{module: cumulative microseconds} from ``-X importtime`` output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if cum.isdigit():
+            cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="crewai_tools.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    samples, cumulative, loaded = [], {}, []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE.format(module=args.module)],
+            capture_output=True, text=True, check=True,
+        )
+        samples.append(time.perf_counter() - started)
+        cumulative = parse_importtime(proc.stderr)
+        loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    top_level = {name: us for name, us in cumulative.items() if "." not in name}
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    print(json.dumps({
+        "module": args.module,
+        "median_startup_ms": round(statistics.median(samples) * 1000, 1),
+        "import_ms": round(cumulative.get(args.module, 0) / 1000, 1),
+        "slowest_top_level_imports_ms": {name: round(us / 1000, 1) for name, us in slowest},
+        "heavy_modules_loaded": [name for name in HEAVY if name in loaded],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
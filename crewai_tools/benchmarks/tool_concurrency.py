@@ -0,0 +1,74 @@
+"""Overlap of get_weather tool calls from parallel crews, offline.
+
+The weather feed is a fake with --latency seconds per lookup, and every call
+asks for a different city so nothing is served from the cache. Sequential
+``_run`` calls take about calls x latency. ``_run`` from one thread per crew
+and ``_arun`` gathered on one event loop should both take about one latency,
+because the lookups overlap on the shared background loop. So should one
+get_itinerary_advice call covering every city.
+
+    python benchmarks/tool_concurrency.py --calls 16 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from travel_core.weather import CachedWeatherProvider, FakeWeatherProvider
+
+
+def fresh_provider(cities, latency):
+    return CachedWeatherProvider(FakeWeatherProvider(cities, latency=latency, jitter=0), ttl=300)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    from crewai_tools import tools
+
+    cities = {f"City{i}": (20 + i % 10, "Cloudy") for i in range(args.calls)}
+    weather, fashion, itinerary = tools.GetWeatherTool(), tools.GetFashionTool(), tools.GetItineraryAdviceTool()
+
+    def sequential():
+        for city in cities:
+            weather._run(city, "2025-05-01")
+
+    def threaded():
+        with ThreadPoolExecutor(max_workers=args.calls) as pool:
+            list(pool.map(lambda city: weather._run(city, "2025-05-01"), cities))
+
+    def gathered():
+        async def run():
+            return await asyncio.gather(*(weather._arun(city, "2025-05-01") for city in cities))
+        return asyncio.run(run())
+
+    def one_itinerary():
+        legs = [{"city": city, "date": "2025-05-01"} for city in cities]
+        assert len(json.loads(itinerary._run(legs))["legs"]) == args.calls
+
+    results = {}
+    for name, fn in (("sequential _run", sequential), ("_run per crew thread", threaded),
+                     ("gathered _arun", gathered), ("one itinerary call", one_itinerary)):
+        tools.weather_provider = fresh_provider(cities, args.latency)
+        results[name] = timed(fn)
+        print(f"{name:>22}: {results[name]:6.2f}s for {args.calls} calls")
+
+    assert fashion._run("Paris", "Cloudy", "22") == asyncio.run(fashion._arun("Paris", "Cloudy", "22"))
+    overlap_bound = args.latency * 3
+    assert results["_run per crew thread"] < overlap_bound, "threaded tool calls did not overlap"
+    assert results["gathered _arun"] < overlap_bound, "async tool calls did not overlap"
+    assert results["one itinerary call"] < overlap_bound, "itinerary legs were not looked up concurrently"
+
+
+if __name__ == "__main__":
+    main()
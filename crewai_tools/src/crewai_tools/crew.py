@@ -1,49 +1,107 @@
-from crewai import Agent, Crew, Process, Task, LLM
-from crewai.project import CrewBase, agent, crew, task
-from crewai_tools.tools import get_tools
-
-tools = get_tools()
-@CrewBase
-class SimpleCrew:
-    agents_config = 'config/agents.yaml'
-    tasks_config = 'config/tasks.yaml'
-    llm = LLM(model="us.amazon.nova-lite-v1:0")
-
-
-    @agent
-    def assistant(self) -> Agent:
-        return Agent(
-            config=self.agents_config['assistant'],
-            llm=self.llm,
-            verbose=True,
-            tools=tools
-        )
-
-    @agent
-    def advisor(self) -> Agent:
-        return Agent(
-            config=self.agents_config['advisor'],
-            llm=self.llm,
-            verbose=True,
-        )
-
-    @task
-    def fashion_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['fashion_task']
-        )
-
-    @task
-    def weather_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['weather_task']
-        )
-
-    @crew
-    def crew(self) -> Crew:
-        return Crew(
-            agents=self.agents,
-            tasks=self.tasks,
-            process=Process.sequential,
-            verbose=True
-        )
+import functools
+import os
+
+from crewai import Agent, Crew, Process, Task
+from crewai.project import CrewBase, agent, crew, task
+from crewai_tools.llm import BedrockLLM
+from crewai_tools.tools import get_tools
+from travel_core.tracing import get_tracer
+
+# Step-by-step console output; with TRAVEL_TRACE_FILE set the same information
+# goes to the trace file instead (see travel_core.tracing).
+VERBOSE = os.getenv("CREW_VERBOSE", "0" if get_tracer().enabled else "1") != "0"
+
+
+@functools.cache
+def default_llm():
+    # Built on first kickoff rather than at import time
+    return BedrockLLM(model="us.amazon.nova-lite-v1:0")
+
+
+def dependency_ordered(tasks):
+    """Order tasks so every task runs after the tasks in its ``context``.
+
+    Tasks are grouped into layers of mutually independent tasks. Within a layer,
+    all but the last task get ``async_execution`` so they run concurrently; the
+    sequential process waits for them before it starts the next layer. An
+    ``async_execution`` set explicitly (e.g. in tasks.yaml) is kept.
+    """
+    remaining = list(tasks)
+    done, ordered = set(), []
+    while remaining:
+        layer = [t for t in remaining
+                 if all(id(dep) in done for dep in (t.context if isinstance(t.context, list) else []))]
+        if not layer:
+            raise ValueError("Task context dependencies form a cycle")
+        for t in layer:
+            if "async_execution" not in t.model_fields_set:
+                t.async_execution = t is not layer[-1]
+        ordered.extend(layer)
+        done.update(id(t) for t in layer)
+        remaining = [t for t in remaining if id(t) not in done]
+    return ordered
+
+
+class TracedTask(Task):
+    """Task that records a span for each execution.
+
+    crewAI 0.102 emits no task events, so the span wraps ``_execute_core``,
+    which both the sequential and the ``async_execution`` paths run on the
+    thread executing the task: the span becomes the parent of its LLM and tool
+    spans. async_execution tasks run on plain threads and start their own trace.
+    """
+
+    def _execute_core(self, agent, context, tools):
+        with get_tracer().span(
+                f"crew.task {self.name or 'task'}",
+                agent=getattr(agent or self.agent, "role", ""),
+                async_execution=bool(self.async_execution)) as span:
+            output = super()._execute_core(agent, context, tools)
+            span.set_attribute("output.chars", len(output.raw or ""))
+            return output
+
+@CrewBase
+class SimpleCrew:
+    agents_config = 'config/agents.yaml'
+    tasks_config = 'config/tasks.yaml'
+    llm = None  # defaults to default_llm()
+
+
+    @agent
+    def assistant(self) -> Agent:
+        return Agent(
+            config=self.agents_config['assistant'],
+            llm=self.llm or default_llm(),
+            verbose=VERBOSE,
+            tools=get_tools()
+        )
+
+    @agent
+    def advisor(self) -> Agent:
+        return Agent(
+            config=self.agents_config['advisor'],
+            llm=self.llm or default_llm(),
+            verbose=VERBOSE,
+        )
+
+    @task
+    def weather_task(self) -> Task:
+        return TracedTask(
+            config=self.tasks_config['weather_task']
+        )
+
+    @task
+    def fashion_task(self) -> Task:
+        # Needs the weather result as context (see tasks.yaml)
+        return TracedTask(
+            config=self.tasks_config['fashion_task']
+        )
+
+    @crew
+    def crew(self) -> Crew:
+        return Crew(
+            agents=self.agents,
+            tasks=dependency_ordered(self.tasks),
+            process=Process.sequential,
+            verbose=VERBOSE
+        )
@@ -0,0 +1,46 @@
+from crewai import LLM
+from travel_core.bedrock import BedrockTransport, get_transport
+from travel_core.llm_cache import ResponseCache, get_cache, make_key
+from travel_core.tracing import get_tracer
+
+
+class BedrockLLM(LLM):
+    """crewAI LLM that shares the process-wide Bedrock transport settings and limit.
+
+    litellm talks to Bedrock with its own HTTP client, so the transport's timeouts,
+    retry budget, region (when one is configured) and endpoint are passed through
+    as litellm parameters and every call holds one of the transport's concurrency
+    slots.
+
+    With a response cache (``cache``, or LLM_CACHE_PATH; see travel_core.llm_cache)
+    a repeated prompt with the same tools and parameters is answered from disk.
+    """
+
+    def __init__(self, model: str, transport: BedrockTransport | None = None,
+                 cache: ResponseCache | None = None, **kwargs):
+        self.transport = transport or get_transport()
+        self.cache = cache if cache is not None else get_cache()
+        settings = self.transport.settings
+        kwargs.setdefault("timeout", settings.read_timeout)
+        kwargs.setdefault("num_retries", settings.max_attempts - 1)
+        if settings.region_name:
+            kwargs.setdefault("aws_region_name", settings.region_name)
+        if settings.endpoint_url:
+            kwargs.setdefault("aws_bedrock_runtime_endpoint", settings.endpoint_url)
+        super().__init__(model=model, **kwargs)
+
+    def call(self, messages, tools=None, *args, **kwargs):
+        with get_tracer().span("llm.call", kind="client", **{"gen_ai.request.model": self.model}) as span:
+            key = None
+            if self.cache is not None:
+                key = make_key(self.model, messages, tools, temperature=self.temperature, stop=self.stop)
+                cached = self.cache.get(key)
+                span.set_attribute("llm.cache.hit", cached is not None)
+                if cached is not None:
+                    return cached
+            with self.transport.slot():
+                response = super().call(messages, tools, *args, **kwargs)
+            # Text answers only; native tool-call objects are not cached
+            if key is not None and isinstance(response, str):
+                self.cache.put(key, response)
+            return response
@@ -1,30 +1,115 @@
 
 
+import asyncio
+import os
+import time
+
 from dotenv import load_dotenv
-from crewai_tools.crew import SimpleCrew
+from travel_core.tracing import get_tracer
 
 load_dotenv()
 
+# crewAI, litellm and the crew itself are imported on first kickoff, so showing
+# the city menu does not pay for them (see benchmarks/importtime.py).
+
+CITIES = ["Copenhagen", "Beijing", "Berlin", "Paris", "Phuket", "Shanghai"]
+MAX_CONCURRENT_CREWS = int(os.getenv("MAX_CONCURRENT_CREWS", "4"))
+# A multi-city trip is one crew run whose agent makes a single
+# get_itinerary_advice call; CREW_PER_CITY=1 runs one crew per city instead.
+CREW_PER_CITY = os.getenv("CREW_PER_CITY", "0") != "0"
+
+def travel_query(city):
+    return {"query": f"I want to travel to {city} on May 1st, 2025, what is the travel advice?"}
+
+def itinerary_query(cities):
+    stops = ", then ".join(f"{city} on May {day}, 2025" for day, city in enumerate(cities, 1))
+    return {"query": f"I want to travel to {stops}, what is the travel advice for each stop?"}
+
+def _record_usage(span, result):
+    usage = getattr(result, "token_usage", None)
+    if usage:
+        span.add_tokens(usage.prompt_tokens, usage.completion_tokens)
+
 def get_travel_advice(city):
-    action_input = {"query": f"I want to travel to {city} on May 1st, 2025, what is the travel advice?"}
+    from crewai_tools.crew import SimpleCrew
+
     try:
-        response = SimpleCrew().crew().kickoff(inputs=action_input)
+        with get_tracer().span("crew.kickoff", city=city) as span:
+            response = SimpleCrew().crew().kickoff(inputs=travel_query(city))
+            _record_usage(span, response)
         print(f"Travel advice for {city}:", response)
     except Exception as e:
         print(f"Error running crew for {city}: {e}")
 
+def get_itinerary_advice(cities):
+    """Advise on a multi-city trip in one crew run."""
+    from crewai_tools.crew import SimpleCrew
+
+    trip = " -> ".join(cities)
+    try:
+        with get_tracer().span("crew.kickoff", city=",".join(cities)) as span:
+            response = SimpleCrew().crew().kickoff(inputs=itinerary_query(cities))
+            _record_usage(span, response)
+        print(f"Travel advice for {trip}:", response)
+    except Exception as e:
+        print(f"Error running crew for {trip}: {e}")
+
+async def _kickoff_many(cities, max_concurrency):
+    from crewai_tools.crew import SimpleCrew
+
+    # Build and configure the crew once; each city runs on a cheap copy of it.
+    template = SimpleCrew().crew()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def kickoff(city):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                with get_tracer().span("crew.kickoff", city=city) as span:
+                    result = await template.copy().kickoff_async(inputs=travel_query(city))
+                    _record_usage(span, result)
+            except Exception as e:
+                result = e
+            return city, result, time.perf_counter() - started
+
+    return await asyncio.gather(*(kickoff(city) for city in cities))
+
+def get_travel_advice_many(cities, max_concurrency=MAX_CONCURRENT_CREWS):
+    """Run one crew per city concurrently; returns {city: CrewOutput or Exception}."""
+    started = time.perf_counter()
+    with get_tracer().span("crew.kickoff_many", cities=",".join(cities), max_concurrency=max_concurrency):
+        outcomes = asyncio.run(_kickoff_many(cities, max_concurrency))
+    wall_clock = time.perf_counter() - started
+
+    results = {}
+    for city, result, elapsed in outcomes:
+        results[city] = result
+        if isinstance(result, Exception):
+            print(f"Error running crew for {city}: {result}")
+        else:
+            print(f"Travel advice for {city} ({elapsed:.1f}s):", result)
+    sequential = sum(elapsed for _, _, elapsed in outcomes)
+    print(f"Advised {len(cities)} cities in {wall_clock:.1f}s wall-clock "
+          f"(sum of crew runs {sequential:.1f}s, speedup {sequential / wall_clock:.1f}x)")
+    return results
+
 def run():
-    cities = ["Copenhagen", "Beijing", "Berlin", "Paris", "Phuket", "Shanghai"]
+    cities = CITIES
     print("Please select a city from the following list:")
     for i, city in enumerate(cities, 1):
         print(f"{i}. {city}")
 
-    choice = input("Enter the number of your choice: ")
+    choice = input("Enter the number of your choice (several numbers separated by commas for a multi-city trip): ")
     try:
-        choice_index = int(choice) - 1
-        if 0 <= choice_index < len(cities):
-            selected_city = cities[choice_index]
-            get_travel_advice(selected_city)
+        choice_indexes = [int(part) - 1 for part in choice.split(",")]
+        if all(0 <= choice_index < len(cities) for choice_index in choice_indexes):
+            selected_cities = list(dict.fromkeys(cities[i] for i in choice_indexes))
+            if len(selected_cities) == 1:
+                get_travel_advice(selected_cities[0])
+            elif CREW_PER_CITY:
+                get_travel_advice_many(selected_cities)
+            else:
+                get_itinerary_advice(selected_cities)
         else:
             print("Invalid selection. Please run the program again and select a valid number.")
     except ValueError:
@@ -1,11 +1,57 @@
 from crewai.tools import BaseTool
-from litellm import completion
+import asyncio
 import os
 from pydantic import BaseModel, Field
 import json
 from dotenv import load_dotenv
 load_dotenv()
-from typing import Type, Optional, List, Dict, Any
+from typing import Type, List
+from travel_core import fashion
+from travel_core.aio import on_shared_loop, run_in_pool, run_sync
+from travel_core.tracing import get_tracer
+from travel_core.weather import CachedWeatherProvider, StaticWeatherProvider, UnknownLocationError, load_provider
+
+
+# Mock weather data for specific cities; set WEATHER_PROVIDER=package.module:factory
+# to use a real feed. Lookups are cached (see travel_core.weather).
+CITY_WEATHER = {
+    "Copenhagen": (18, "Partly cloudy"),
+    "Beijing": (25, "Sunny"),
+    "Berlin": (20, "Clear sky"),
+    "Paris": (22, "Cloudy"),
+    "Phuket": (32, "Tropical"),
+    "Shanghai": (28, "Humid")
+}
+weather_provider = CachedWeatherProvider(
+    load_provider(os.environ["WEATHER_PROVIDER"]) if os.getenv("WEATHER_PROVIDER")
+    else StaticWeatherProvider(CITY_WEATHER),
+    ttl=float(os.getenv("WEATHER_CACHE_TTL", "300")),
+    stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "3600")),
+)
+tracer = get_tracer()
+
+
+async def weather_info(location: str, date: str) -> dict:
+    try:
+        report = await weather_provider.get(location)
+        return {
+            "location": location,
+            "temperature": f"{report.temperature:g}",
+            "description": report.description,
+            "date": date or "current"
+        }
+    except UnknownLocationError as e:
+        return {
+            "error": f"No weather data available for {location}. Available cities: {', '.join(e.available)}",
+            "location": location,
+            "date": date or "current"
+        }
+    except Exception as e:
+        return {
+            "error": f"An error occurred: {str(e)}",
+            "location": location,
+            "date": date or "current"
+        }
 
 
 class GetWeatherToolInput(BaseModel):
@@ -17,41 +63,19 @@ class GetWeatherTool(BaseTool):
     description: str = "Get the weather for a specific location and date."
     args_schema: Type[BaseModel] = GetWeatherToolInput
 
+    # Both entry points run the lookup on the shared background loop, so the
+    # cache's in-flight fetches and revalidations outlive the call and lookups
+    # from parallel crews overlap there.
     def _run(self, location: str, date: str) -> str:
-        # Mock weather data for specific cities
-        weather_data = {
-            "Copenhagen": {"temperature": "18", "description": "Partly cloudy"},
-            "Beijing": {"temperature": "25", "description": "Sunny"},
-            "Berlin": {"temperature": "20", "description": "Clear sky"},
-            "Paris": {"temperature": "22", "description": "Cloudy"},
-            "Phuket": {"temperature": "32", "description": "Tropical"},
-            "Shanghai": {"temperature": "28", "description": "Humid"}
-        }
+        with tracer.span("tool.get_weather", location=location, date=date or "current"):
+            return run_sync(self._lookup(location, date))
+
+    async def _arun(self, location: str, date: str) -> str:
+        with tracer.span("tool.get_weather", location=location, date=date or "current"):
+            return await on_shared_loop(self._lookup(location, date))
 
-        try:
-            if location not in weather_data:
-                return json.dumps({
-                    "error": f"No weather data available for {location}. Available cities: {', '.join(weather_data.keys())}",
-                    "location": location,
-                    "date": date or "current"
-                })
-
-            data = weather_data[location]
-            print(f"Fetching weather for {location} at {date or 'current'}")
-            response = {
-                "location": location,
-                "temperature": data["temperature"],
-                "description": data["description"],
-                "date": date or "current"
-            }
-
-            return json.dumps(response, ensure_ascii=False)
-        except Exception as e:
-            return json.dumps({
-                "error": f"An error occurred: {str(e)}",
-                "location": location,
-                "date": date or "current"
-            })
+    async def _lookup(self, location: str, date: str) -> str:
+        return json.dumps(await weather_info(location, date), ensure_ascii=False)
 
 
 class GetFashionToolInput(BaseModel):
@@ -65,114 +89,68 @@ class GetFashionTool(BaseTool):
     args_schema: Type[BaseModel] = GetFashionToolInput
 
     def _run(self, location: str, weather: str, temperature: str) -> str:
-        import json
-
-        # Parse temperature
-        temp_value = float(temperature.replace("°C", ""))
-
-        # Basic advice based on temperature
-        if temp_value < 10:
-            base_clothing = {
-                "Coat": "Thick coat or down jacket",
-                "Top": "Warm sweater or high-neck knitwear",
-                "Bottom": "Warm trousers",
-                "Accessories": "Scarf, hat, and gloves",
-                "Shoes": "Waterproof and warm boots"
-            }
-        elif temp_value < 20:
-            base_clothing = {
-                "Coat": "Light jacket or windbreaker",
-                "Top": "Long-sleeved shirt or sweater",
-                "Bottom": "Casual trousers",
-                "Accessories": "Scarf (may be needed in the morning and evening)",
-                "Shoes": "Comfortable sneakers or casual shoes"
-            }
-        else:
-            base_clothing = {
-                "Coat": "Optional lightweight sun protection jacket",
-                "Top": "Short-sleeved or lightweight long-sleeved",
-                "Bottom": "Lightweight trousers or shorts",
-                "Accessories": "Sun hat and sunglasses",
-                "Shoes": "Sandals or breathable sneakers"
-            }
-
-        # City-specific advice
-        city_specific = {
-            "Copenhagen": {
-                "City Characteristics": "Nordic fashion capital, minimalist style",
-                "Dressing Style": "Simple and elegant, mainly black, white, and gray",
-                "Cultural Advice": "Conservative attire, emphasizing environmental awareness",
-                "Special Tips": "Weather can be unpredictable; bring rain gear",
-                "Suitable Venues": "Design Museum, Nyhavn, The Little Mermaid",
-                "Taboos": "Avoid overly flashy outfits"
-            },
-            "Beijing": {
-                "City Characteristics": "Modern and traditional international metropolis",
-                "Dressing Style": "Elegant and practical",
-                "Cultural Advice": "Dress formally when visiting attractions",
-                "Special Tips": "Pay attention to air quality; prepare masks",
-                "Suitable Venues": "Forbidden City, Great Wall, Hutongs",
-                "Taboos": "Avoid revealing attire when visiting temples"
-            },
-            "Berlin": {
-                "City Characteristics": "Fusion of avant-garde art and historical culture",
-                "Dressing Style": "Individualized, street style is popular",
-                "Cultural Advice": "Dress can be bold and innovative",
-                "Special Tips": "Large temperature differences in spring and autumn; layer clothing",
-                "Suitable Venues": "Museum Island, Brandenburg Gate, East Side Gallery",
-                "Taboos": "Avoid inappropriate attire when visiting memorials"
-            },
-            "Paris": {
-                "City Characteristics": "Global fashion capital",
-                "Dressing Style": "Elegant and fashionable, emphasizing details",
-                "Cultural Advice": "Lean towards formal elegance",
-                "Special Tips": "High-end restaurants require formal attire",
-                "Suitable Venues": "Eiffel Tower, Louvre, Champs-Élysées",
-                "Taboos": "Avoid athletic wear in formal settings"
-            },
-            "Phuket": {
-                "City Characteristics": "Tropical island resort",
-                "Dressing Style": "Light and cool, vacation style",
-                "Cultural Advice": "Be mindful of Thai cultural etiquette",
-                "Special Tips": "Sunscreen and insect repellent are essential",
-                "Suitable Venues": "Beaches, temples, night markets",
-                "Taboos": "Dress appropriately when visiting temples"
-            },
-            "Shanghai": {
-                "City Characteristics": "Modern international metropolis",
-                "Dressing Style": "Fashionable and avant-garde, blending Eastern and Western elements",
-                "Cultural Advice": "Dress can be fashionable and bold",
-                "Special Tips": "Carry rain gear and check weather forecasts",
-                "Suitable Venues": "The Bund, Yu Garden, Tianzifang",
-                "Taboos": "Avoid overly casual attire in special occasions"
-            }
-        }
-
-        # Get city-specific information
-        city_info = city_specific.get(location, {
-            "City Characteristics": "Please check local characteristics",
-            "Dressing Style": "Suggest checking local dressing habits",
-            "Cultural Advice": "Be mindful of local culture",
-            "Special Tips": "Suggest checking local weather forecasts",
-            "Suitable Venues": "Please check local tourist information",
-            "Taboos": "Be mindful of dressing appropriately"
-        })
-
-        # Combine response
-        response = {
-            "Location": location,
-            "Temperature": temperature,
-            "Basic Clothing Advice": base_clothing,
-            "City-Specific Advice": city_info,
-            "Weather Reminder": f"Current temperature {temperature}, " + (
-                "Pay attention to keeping warm" if temp_value < 10 else
-                "Temperature is moderate" if temp_value < 20 else
-                "Pay attention to sun protection and cooling"
-            )
-        }
-
-        return json.dumps(response, ensure_ascii=False, indent=2)
+        # Shared precomputed tables (travel_core.fashion), same output as before
+        with tracer.span("tool.get_fashion", location=location, temperature=temperature):
+            return fashion.render_basic(location, weather, temperature)
+
+    async def _arun(self, location: str, weather: str, temperature: str) -> str:
+        # CPU-only work: keep it off the caller's event loop
+        with tracer.span("tool.get_fashion", location=location, temperature=temperature):
+            return await run_in_pool(fashion.render_basic, location, weather, temperature)
+
+
+# Same leg schema as the MCP server's get_itinerary_advice
+class ItineraryLeg(BaseModel):
+    city: str = Field(..., description="City name (Copenhagen/Beijing/Berlin/Paris/Phuket/Shanghai)")
+    date: str = Field("", description="Date of this stop (YYYY-MM-DD)")
+    time_period: str = Field("下午", description="Time of day: 上午 (morning), 下午 (afternoon), 晚上 (evening) "
+                                                "or 凌晨 (night)")
+
+class GetItineraryAdviceToolInput(BaseModel):
+    legs: List[ItineraryLeg] = Field(..., description="Stops of the trip in travel order, one per city and date")
+
+class GetItineraryAdviceTool(BaseTool):
+    name: str = "get_itinerary_advice"
+    description: str = ("Get the weather and fashion advice for every stop of a multi-city trip in one call, "
+                        "instead of calling get_weather and get_fashion once per city.")
+    args_schema: Type[BaseModel] = GetItineraryAdviceToolInput
+
+    def _run(self, legs: List[ItineraryLeg]) -> str:
+        with tracer.span("tool.get_itinerary_advice", legs=len(legs)):
+            return run_sync(self._advise(legs))
+
+    async def _arun(self, legs: List[ItineraryLeg]) -> str:
+        with tracer.span("tool.get_itinerary_advice", legs=len(legs)):
+            return await on_shared_loop(self._advise(legs))
+
+    async def _advise(self, legs: List[ItineraryLeg]) -> str:
+        # Legs arrive as dicts or as validated models; every city is looked up at once
+        legs = [ItineraryLeg.model_validate(leg) for leg in legs]
+        cities = list(dict.fromkeys(leg.city for leg in legs))
+        weather = dict(zip(cities, await asyncio.gather(*(weather_info(city, "") for city in cities))))
+        stops, advised = [], []
+        for leg in legs:
+            info = weather[leg.city]
+            stop = {"city": leg.city, "date": leg.date or "current", "time_period": leg.time_period}
+            if "error" in info:
+                stop["error"] = info["error"]
+            elif leg.time_period not in fashion.TIME_PERIODS:
+                stop["error"] = f"Unknown time period {leg.time_period}. Choose from {', '.join(fashion.TIME_PERIODS)}"
+            else:
+                advised.append((stop, info))
+            stops.append(stop)
+        # Advice follows the felt temperature at that time of day, as on the server;
+        # all legs are classified in one pass
+        recommendations = fashion.recommend_many([info["temperature"] for _, info in advised],
+                                                 [stop["time_period"] for stop, _ in advised])
+        for (stop, info), recommendation in zip(advised, recommendations):
+            feels_like = f"{recommendation.feels_like:g}"
+            stop["weather"] = {"temperature": info["temperature"], "feels_like": feels_like,
+                               "description": info["description"]}
+            stop["fashion"] = json.loads(fashion.render_basic(stop["city"], info["description"], feels_like))
+        packing = fashion.packing_list(stop["fashion"]["Basic Clothing Advice"] for stop in stops if "fashion" in stop)
+        return json.dumps({"legs": stops, "packing_list": packing}, ensure_ascii=False)
 
 
 def get_tools():
-    return [GetWeatherTool(),GetFashionTool()]
\ No newline at end of file
+    return [GetWeatherTool(),GetFashionTool(),GetItineraryAdviceTool()]
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Latency benchmark: direct MCP tool invocation vs the LLM agent round-trip.
+
+Needs a running server.py and Bedrock credentials for the agent path:
+    python bench_client.py --runs 5 --city Paris
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from client import call_tool, create_agent, fashion_arguments, get_fashion_advice, get_weather
+from tool_catalog import ToolCatalog
+
+USER_PREFS = {"age": "30", "style": "休闲"}
+TIME_PERIOD = "下午"
+
+
+async def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+async def run(url, city, runs):
+    async with ToolCatalog({"weather_fashion": {"url": url, "transport": "sse"}}) as catalog:
+        return await compare(await catalog.get_tools("weather_fashion"), city, runs)
+
+
+async def compare(tools, city, runs):
+    weather_agent = create_agent(tools, "get_weather")
+    fashion_agent = create_agent(tools, "get_fashion")
+    weather_data = await call_tool(tools, "get_weather", {"location": city})
+    arguments = fashion_arguments(city, weather_data, USER_PREFS, TIME_PERIOD)
+
+    return {
+        "get_weather": {
+            "direct": await timed(lambda: call_tool(tools, "get_weather", {"location": city}), runs),
+            "agent": await timed(lambda: get_weather(weather_agent, city), runs),
+        },
+        "get_fashion": {
+            "direct": await timed(lambda: call_tool(tools, "get_fashion", arguments), runs),
+            "agent": await timed(
+                lambda: get_fashion_advice(fashion_agent, city, weather_data, USER_PREFS, TIME_PERIOD), runs),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000/sse")
+    parser.add_argument("--city", default="Paris")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.url, args.city, args.runs)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Per-user-session MCP cost: a fresh ToolCatalog per session vs one shared pool.
+
+Starts server.py locally and runs --sessions user sessions, --concurrency at
+a time. Each session lists the tools and calls get_weather once. "fresh"
+opens and tears down its own catalog the way client.main() does, and
+"pooled" shares one ToolCatalog with --pool-size connections. The pooled
+catalog then lives through a server restart: its health checks notice, it
+reconnects with backoff, and the same tools work again.
+
+    python bench_pool.py --sessions 40 --concurrency 8 --pool-size 2
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from contextlib import ExitStack
+
+from loadtest import local_server
+from tool_catalog import ToolCatalog
+
+SERVER = "weather_fashion"
+
+
+def connections(url):
+    return {SERVER: {"url": f"{url}/sse", "transport": "sse"}}
+
+
+async def user_session(catalog, city):
+    tools = await catalog.get_tools(SERVER)
+    weather = next(tool for tool in tools if tool.name == "get_weather")
+    return await weather.ainvoke({"location": city})
+
+
+async def drive(sessions, concurrency, run_one):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            await run_one(i)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(sessions)))
+    return {
+        "wall_s": round(time.perf_counter() - started, 3),
+        "median_ms": round(statistics.median(latencies) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+async def run(args, servers):
+    url = await asyncio.to_thread(servers.enter_context, local_server(args.port))
+
+    async def fresh(i):
+        async with ToolCatalog(connections(url)) as catalog:
+            await user_session(catalog, "Paris")
+
+    catalog = ToolCatalog(connections(url), pool_size=args.pool_size, health_interval=0.5, health_timeout=1.0,
+                          backoff_initial=0.2, backoff_max=2.0)
+    try:
+        await catalog.pool.warm(SERVER)
+        report = {
+            "fresh": await drive(args.sessions, args.concurrency, fresh),
+            "pooled": await drive(args.sessions, args.concurrency, lambda i: user_session(catalog, "Paris")),
+        }
+        report["pool"] = catalog.pool.stats()[SERVER]
+        assert report["pool"]["live"] <= args.pool_size
+
+        # Restart the server under the live pool
+        await asyncio.to_thread(servers.close)
+        await asyncio.to_thread(servers.enter_context, local_server(args.port))
+        started = time.perf_counter()
+        while True:
+            try:
+                await user_session(catalog, "Berlin")
+                break
+            except Exception:
+                if time.perf_counter() - started > 30:
+                    raise
+                await asyncio.sleep(0.2)
+        report["recovered_after_restart_s"] = round(time.perf_counter() - started, 3)
+        report["pool_after_restart"] = catalog.pool.stats()[SERVER]
+        assert report["pool_after_restart"]["connects"] > report["pool"]["connects"], "pool did not reconnect"
+    finally:
+        await catalog.aclose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+    with ExitStack() as servers:
+        report = asyncio.run(run(args, servers))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
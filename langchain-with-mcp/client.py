@@ -1,34 +1,65 @@
 import asyncio
 import json
-from langchain_mcp_adapters.client import MultiServerMCPClient
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import timedelta
 from langgraph.prebuilt import create_react_agent
 from langchain.schema import AIMessage
 from langchain_aws import ChatBedrockConverse
-import boto3
 import aioconsole
+from travel_core import fashion
+from travel_core.bedrock import get_transport
+from travel_core.llm_cache import get_cache, langchain_cache
+from travel_core.tracing import get_tracer
 
-bedrock_client = boto3.client(service_name="bedrock-runtime", region_name="us-west-2")
+from tool_catalog import ToolCatalog
+
+# Pooled, retrying Bedrock client shared with the crewAI demo; model calls are
+# capped at BEDROCK_MAX_CONCURRENCY in flight (see travel_core.bedrock).
+bedrock_transport = get_transport().warm()
+
+# Session, tool, agent and Bedrock spans go to TRAVEL_TRACE_FILE when it is set
+tracer = get_tracer()
+
+# Repeated agent prompts are answered from disk when LLM_CACHE_PATH is set
+# (see travel_core.llm_cache)
+response_cache = get_cache()
 
 llm = ChatBedrockConverse(
-    client=bedrock_client,
+    client=bedrock_transport.client,
     model_id="anthropic.claude-3-5-sonnet-20241022-v2:0", #  anthropic.claude-3-5-sonnet-20241022-v2:0
+    cache=langchain_cache(response_cache) if response_cache else None,
 ) # us.amazon.nova-lite-v1:0
 
+# Menu choices already fix every tool argument, so by default the MCP tools are
+# called directly and the LLM agent is only used for free-text input.
+# Set DIRECT_TOOL_CALLS=0 to always go through the agent.
+DIRECT_TOOL_CALLS = os.getenv("DIRECT_TOOL_CALLS", "1") != "0"
+
+# Answers get_user_preferences returns when the user just presses enter
+DEFAULT_PREFS = {"age": "18", "style": "休闲"}
+
+CITIES = ["Copenhagen", "Beijing", "Berlin", "Paris", "Phuket", "Shanghai"]
+
 async def select_city():
-    cities = ["Copenhagen", "Beijing", "Berlin", "Paris", "Phuket", "Shanghai"]
     print("\n🌍 请从列表中选择一个城市：")
-    for i, city in enumerate(cities, 1):
+    for i, city in enumerate(CITIES, 1):
         print(f"{i}. {city}")
     while True:
-        choice = await aioconsole.ainput("请输入你的选择编号（默认1）：") or "1"
-        try:
-            index = int(choice) - 1
-            if 0 <= index < len(cities):
-                return cities[index]
-            else:
-                print("无效的数字，请重试。")
-        except ValueError:
-            print("无效的输入，请输入一个数字。")
+        choice = await aioconsole.ainput(
+            "请输入你的选择编号（默认1；多城市行程用逗号分隔，如 1,4），或直接输入城市名称：") or "1"
+        parts = [part.strip() for part in choice.split(",")]
+        if not all(part.isdigit() for part in parts):
+            # Free text, e.g. "巴黎" - resolved by the agent
+            return choice
+        indexes = [int(part) - 1 for part in parts]
+        if all(0 <= index < len(CITIES) for index in indexes):
+            # Several cities are planned as one itinerary (see advise_itinerary)
+            cities = list(dict.fromkeys(CITIES[index] for index in indexes))
+            return cities[0] if len(cities) == 1 else cities
+        print("无效的数字，请重试。")
 
 async def get_time():
     print("\n⏰ 你想获取哪个时间段的建议？")
@@ -73,14 +104,57 @@ async def get_user_preferences():
             }
         print("无效的选择，请重试。")
 
-async def create_agent(client, tool_name: str):
+# MCP_TRANSPORT=streamable_http uses plain HTTP requests to /mcp instead of a
+# long-lived SSE stream per session
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "sse")
+MCP_CONNECTIONS = {
+    "weather_fashion": {
+        "url": os.getenv("MCP_URL", "http://localhost:8000/mcp" if MCP_TRANSPORT == "streamable_http"
+                         else "http://localhost:8000/sse"),
+        "transport": MCP_TRANSPORT,
+    }
+}
+
+# Time budget per tool call; streamed calls also send it to the server as
+# _meta.timeout_ms, so queued work is dropped once nobody is waiting for it
+TOOL_TIMEOUT_MS = float(os.getenv("TOOL_TIMEOUT_MS", "30000"))
+
+def create_agent(tools, tool_name: str):
     """Create an agent that uses a specific tool from the weather_fashion server"""
-    tools = await client.get_tools(server_name="weather_fashion")
     return create_react_agent(llm, [tool for tool in tools if tool.name == tool_name])
 
+def parse_tool_result(result):
+    """Decode the content returned by an MCP tool into JSON when possible."""
+    if isinstance(result, list):
+        # Content blocks, e.g. [{"type": "text", "text": "..."}]
+        result = "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in result)
+    try:
+        return json.loads(result)
+    except (TypeError, json.JSONDecodeError):
+        return result
+
+async def call_tool(tools, tool_name: str, arguments: dict):
+    """Invoke an MCP tool directly with structured arguments, bypassing the LLM."""
+    tool = next(tool for tool in tools if tool.name == tool_name)
+    with tracer.span(f"mcp.call_tool {tool_name}", kind="client"):
+        async with asyncio.timeout(TOOL_TIMEOUT_MS / 1000):
+            result = await tool.ainvoke(arguments)
+        with tracer.span("json.decode"):
+            return parse_tool_result(result)
+
+async def invoke_agent(agent, prompt):
+    """``agent.ainvoke`` in a span that records the run's token usage."""
+    with tracer.span("agent.ainvoke") as span:
+        response = await agent.ainvoke(prompt)
+        for message in response["messages"]:
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                span.add_tokens(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        return response
+
 async def get_weather(agent, city):
     weather_prompt = {"messages": [{"role": "user", "content": f"Use the get_weather tool to get weather information for {city}"}]}
-    weather_response = await agent.ainvoke(weather_prompt)
+    weather_response = await invoke_agent(agent, weather_prompt)
 
     for message in reversed(weather_response['messages']):
         if isinstance(message, AIMessage) and message.content:
@@ -90,52 +164,156 @@ async def get_weather(agent, city):
                 return message.content
     return None
 
+async def stream_tool(session, tool_name: str, arguments: dict):
+    """Call an MCP tool and yield the sections it reports as progress messages.
+
+    Yields the final result instead if the server did not send any sections.
+    """
+    queue = asyncio.Queue()
+
+    async def on_progress(progress, total, message):
+        if message:
+            queue.put_nowait(parse_tool_result(message))
+
+    with tracer.span(f"mcp.call_tool {tool_name}", kind="client", streamed=True) as span:
+        call = asyncio.create_task(session.call_tool(
+            tool_name, arguments, read_timeout_seconds=timedelta(milliseconds=TOOL_TIMEOUT_MS),
+            progress_callback=on_progress, meta={"timeout_ms": TOOL_TIMEOUT_MS}))
+        # Progress notifications are delivered before the response, so this comes last
+        call.add_done_callback(lambda _: queue.put_nowait(None))
+        streamed = False
+        try:
+            while (section := await queue.get()) is not None:
+                streamed = True
+                span.add_event("section received")
+                yield section
+            result = call.result()
+            content = [block.model_dump() for block in result.content]
+            if result.isError:
+                raise RuntimeError(parse_tool_result(content))
+            if not streamed:
+                yield parse_tool_result(content)
+        finally:
+            call.cancel()
+
 async def format_fashion_advice(advice):
-    if isinstance(advice, str):
+    """Yield printable text for fashion advice as soon as each part is available.
+
+    ``advice`` is either a complete result (dict or string) or an async iterator
+    of partial results, e.g. the sections streamed by get_fashion_stream.
+    """
+    if hasattr(advice, "__aiter__"):
+        async for section in advice:
+            async for text in format_fashion_advice(section):
+                yield text
+    elif isinstance(advice, str):
         # If it's already a string, just return it with proper line breaks
-        return advice.replace('\\n', '\n')
+        yield advice.replace('\\n', '\n')
     elif isinstance(advice, dict):
         # Format dictionary content with proper indentation and line breaks
-        formatted = []
         for key, value in advice.items():
             if isinstance(value, dict):
-                formatted.append(f"\n{key}:")
-                for sub_key, sub_value in value.items():
-                    formatted.append(f"  • {sub_key}: {sub_value}")
+                yield "\n".join([f"\n{key}:"] + [f"  • {sub_key}: {sub_value}" for sub_key, sub_value in value.items()])
             else:
-                formatted.append(f"{key}: {value}")
-        return '\n'.join(formatted)
-    return str(advice)
+                yield f"{key}: {value}"
+    else:
+        yield str(advice)
 
-async def get_fashion_advice(agent, city, weather_data, user_prefs, time_period):
+# "22C", "22°C", "-3.5 ℃" in the agent's free-text weather answers
+_TEMPERATURE = re.compile(r"(-?\d+(?:\.\d+)?)\s*(?:°\s*C|℃|C(?![A-Za-z]))")
+
+def fashion_arguments(city, weather_data, user_prefs, time_period):
+    """get_fashion arguments for the weather get_weather (or the agent) returned.
+
+    Raises ValueError when the weather is an error or names no temperature,
+    since get_fashion cannot advise without one.
+    """
     if isinstance(weather_data, dict):
-        temperature = weather_data.get('temperature', 'unknown')
-        description = weather_data.get('description', 'unknown')
+        if "error" in weather_data:
+            raise ValueError(weather_data["error"])
+        temperature = weather_data.get('temperature')
+        description = weather_data.get('description', '')
     else:
-        temperature = 'unknown'
+        match = _TEMPERATURE.search(str(weather_data or ""))
+        temperature = f"{match.group(1)}C" if match else None
         description = weather_data
+    if temperature is None:
+        raise ValueError(f"无法从天气信息中得到{city}的气温：{weather_data}")
+    return {
+        "location": city,
+        "temperature": temperature,
+        "description": description,
+        "time_period": time_period,
+        "age": user_prefs["age"],
+        "style": user_prefs["style"]
+    }
+
+class AdviceCache:
+    """LRU memo of fashion advice, keyed on the inputs get_fashion depends on.
+
+    Entries are tasks, so a request that arrives while an identical one (e.g. the
+    speculative prefetch) is still running waits for it instead of refetching.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(city, weather_data, user_prefs, time_period):
+        """(city, temperature band, time period, age group, style), or None if uncacheable."""
+        try:
+            temperature = fashion.parse_temperature(weather_data["temperature"])
+        except (TypeError, KeyError, ValueError):
+            return None
+        band = fashion.temperature_band(fashion.feels_like(temperature, time_period))
+        return (city, band, time_period, fashion.age_group(user_prefs["age"]), user_prefs["style"])
+
+    def __contains__(self, key):
+        task = self._entries.get(key)
+        return task is not None and not (task.done() and (task.cancelled() or task.exception()))
+
+    async def get_or_fetch(self, key, fetch):
+        if key in self:
+            task = self._entries[key]
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            task = self._entries[key] = asyncio.ensure_future(fetch())
+            self._evict()
+        return await asyncio.shield(task)
+
+    def reserve(self, key):
+        """Count a miss and return a future to resolve with the advice for ``key``,
+        for results the caller produces itself (e.g. streamed). Until it is
+        resolved, identical requests wait for it; if it fails, they refetch."""
+        self.misses += 1
+        future = self._entries[key] = asyncio.get_running_loop().create_future()
+        self._evict()
+        return future
+
+    def _evict(self):
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+advice_cache = AdviceCache()
+
+async def get_fashion_advice(agent, city, weather_data, user_prefs, time_period):
     messages = [{
             "role": "user", 
-            "content": json.dumps({
-                "location": city,
-                "temperature": "18",
-                "time_period": time_period,
-                "age": user_prefs["age"],
-                "style": user_prefs["style"]
-            })
+            "content": json.dumps(fashion_arguments(city, weather_data, user_prefs, time_period))
         }]
 
-    # print(f"messages: {messages}")
     # 构造工具调用参数
     fashion_prompt = {
         "messages": messages
     }
-    try:
-        fashion_response = await agent.ainvoke(fashion_prompt)
-    except Exception as e:
-        print(f"❌ 对话过程中出现错误：{e}")
-        return None
-    # print(f"fashion_response: {fashion_response}")
+    # Errors propagate, so a failed fetch is not memoized in advice_cache and
+    # the next request for the same key retries; main() reports them
+    fashion_response = await invoke_agent(agent, fashion_prompt)
 
     for message in reversed(fashion_response['messages']):
         if isinstance(message, AIMessage) and message.content:
@@ -143,50 +321,186 @@ async def get_fashion_advice(agent, city, weather_data, user_prefs, time_period)
                 return json.loads(message.content)
             except json.JSONDecodeError:
                 return message.content
-    return None
+    raise RuntimeError("智能体没有返回穿搭建议")
 
-async def main():
-    print("👋 欢迎使用天气与穿搭助手！")
-    
-    # Step 1: Select city
-    city = await select_city()
-    print(f"\n✨ 已选择城市：{city}")
+async def fetch_weather(tools, city, direct):
+    if direct:
+        return await call_tool(tools, "get_weather", {"location": city})
+    return await get_weather(create_agent(tools, "get_weather"), city)
 
-    # Step 2: Select time period
-    time_period = await get_time()
-    print(f"✨ 已选择时间：{time_period}")
+async def fetch_fashion(tools, weather_task, city, user_prefs, time_period, direct):
+    # shield: cancelling a speculative fetch must not cancel the shared weather task
+    weather_data = await asyncio.shield(weather_task)
 
-    client = MultiServerMCPClient(
-        {
-            "weather_fashion": {
-                "url": "http://localhost:8000/sse",
-                "transport": "sse",
-            }
-        }
-    )
+    async def fetch():
+        if direct:
+            return await call_tool(
+                tools, "get_fashion", fashion_arguments(city, weather_data, user_prefs, time_period))
+        return await get_fashion_advice(
+            create_agent(tools, "get_fashion"), city, weather_data, user_prefs, time_period)
+
+    key = AdviceCache.key(city, weather_data, user_prefs, time_period)
+    if key is None:
+        return await fetch()
+    return await advice_cache.get_or_fetch(key, fetch)
+
+async def fashion_sections(catalog, tools, weather_task, city, user_prefs, time_period, direct):
+    """Yield the advice as it arrives: cached results at once, otherwise streamed
+    section by section from get_fashion_stream when calling tools directly."""
+    weather_data = await asyncio.shield(weather_task)
+    key = AdviceCache.key(city, weather_data, user_prefs, time_period)
+    if direct and key not in advice_cache and any(tool.name == "get_fashion_stream" for tool in tools):
+        # The merged sections are cached like a get_fashion result, so asking
+        # again in this session is answered at once
+        cached = advice_cache.reserve(key) if key is not None else None
+        sections = []
+        try:
+            session = await catalog.session("weather_fashion")
+            async for section in stream_tool(
+                    session, "get_fashion_stream", fashion_arguments(city, weather_data, user_prefs, time_period)):
+                sections.append(section)
+                yield section
+        except BaseException as e:
+            if cached is not None:
+                if isinstance(e, Exception):
+                    cached.set_exception(e)
+                    cached.exception()  # whoever waits on it sees the error; don't log it as unretrieved
+                else:
+                    cached.cancel()
+            raise
+        if cached is not None:
+            if all(isinstance(section, dict) for section in sections):
+                cached.set_result({k: v for section in sections for k, v in section.items()})
+            else:
+                cached.set_result(sections[-1])
+    else:
+        yield await fetch_fashion(tools, weather_task, city, user_prefs, time_period, direct)
 
+async def unless_failed(background, prompt):
+    """Await ``prompt``, but give up and raise as soon as ``background`` fails."""
+    task = asyncio.ensure_future(prompt)
     try:
-        # Create agents for weather and fashion
-        weather_agent = await create_agent(client, "get_weather")
-        fashion_agent = await create_agent(client, "get_fashion")
+        await asyncio.wait({task, background}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done() and background.exception() is not None:
+            raise background.exception()
+        return await task
+    finally:
+        task.cancel()
 
-        # Step 3: Get weather information
-        print("\n🌤️ 正在获取天气信息...")
-        weather_data = await get_weather(weather_agent, city)
-        print("\n天气信息：", json.dumps(weather_data, ensure_ascii=False, indent=2))
+async def advise(catalog, city, direct):
+    # One tools/list round-trip over one session; agents just filter it
+    tools = await catalog.get_tools("weather_fashion")
 
-        # Step 4: Get user preferences
-        user_prefs = await get_user_preferences()
+    # Weather does not depend on any of the remaining prompts, so it runs while
+    # the user answers them; fashion advice for the default preferences is
+    # prefetched as soon as the time period is known.
+    print("\n🌤️ 正在后台获取天气信息...")
+    weather_task = asyncio.create_task(fetch_weather(tools, city, direct))
+    prefetch_task = None
+    try:
+        # Step 2: Select time period
+        time_period = await unless_failed(weather_task, get_time())
+        print(f"✨ 已选择时间：{time_period}")
+        prefetch_task = asyncio.create_task(
+            fetch_fashion(tools, weather_task, city, DEFAULT_PREFS, time_period, direct))
+
+        # Step 3: Get user preferences
+        user_prefs = await unless_failed(weather_task, get_user_preferences())
         print(f"\n✨ 个人信息：{user_prefs['age']}岁，{user_prefs['style']}风格")
+        answered_at = time.perf_counter()
 
-        # Step 5: Get personalized fashion advice
+        # Step 4: Weather information (usually ready by now)
+        weather_data = await weather_task
+        print("\n天气信息：", json.dumps(weather_data, ensure_ascii=False, indent=2))
+        if isinstance(weather_data, dict) and "error" in weather_data:
+            # No temperature to base the advice on
+            print(f"❌ {weather_data['error']}")
+            return
+
+        # Step 5: Get personalized fashion advice (served from the prefetch when
+        # the preferences map onto the same cache key, streamed otherwise)
         print("\n👔 正在获取个性化穿搭建议...")
-        fashion_advice = await get_fashion_advice(fashion_agent, city, weather_data, user_prefs, time_period)
-        formatted_advice = await format_fashion_advice(fashion_advice)
-        print("\n穿搭建议：\n", formatted_advice)
+        print("\n穿搭建议：")
+        first_line_at = None
+        with tracer.span("client.fashion_advice", city=city, time_period=time_period) as span:
+            advice = fashion_sections(catalog, tools, weather_task, city, user_prefs, time_period, direct)
+            async for text in format_fashion_advice(advice):
+                first_line_at = first_line_at or time.perf_counter()
+                print(text)
+            if first_line_at:
+                span.set_attribute("first_line_ms", round((first_line_at - answered_at) * 1000, 1))
+        if first_line_at:
+            print(f"\n⏱️ 首条建议耗时：{first_line_at - answered_at:.2f}s（自填写完偏好起）")
+        print(f"📦 建议缓存：命中 {advice_cache.hits} 次，未命中 {advice_cache.misses} 次")
+    finally:
+        tasks = [task for task in (weather_task, prefetch_task) if task]
+        for task in tasks:
+            task.cancel()
+        # Collect their errors too; the failure itself is reported by main()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+async def advise_itinerary(catalog, cities, direct):
+    """Advice for a multi-city trip from one get_itinerary_advice call, which
+    looks up the weather for all cities at once on the server."""
+    tools = await catalog.get_tools("weather_fashion")
+    time_period = await get_time()
+    print(f"✨ 已选择时间：{time_period}")
+    user_prefs = await get_user_preferences()
+    print(f"\n✨ 个人信息：{user_prefs['age']}岁，{user_prefs['style']}风格")
+    arguments = {"legs": [{"city": city, "time_period": time_period} for city in cities], **user_prefs}
 
+    print(f"\n🗺️ 正在获取行程建议：{' → '.join(cities)}")
+    with tracer.span("client.itinerary", cities=",".join(cities), direct=direct):
+        if direct:
+            itinerary = await call_tool(tools, "get_itinerary_advice", arguments)
+        else:
+            prompt = {"messages": [{"role": "user", "content": json.dumps(arguments, ensure_ascii=False)}]}
+            response = await invoke_agent(create_agent(tools, "get_itinerary_advice"), prompt)
+            itinerary = next((parse_tool_result(message.content) for message in reversed(response["messages"])
+                              if isinstance(message, AIMessage) and message.content), None)
+    if not isinstance(itinerary, dict):
+        async for text in format_fashion_advice(itinerary):
+            print(text)
+        return
+    for leg in itinerary["legs"]:
+        print(f"\n📍 {leg['city']}（{leg['time_period']}）")
+        async for text in format_fashion_advice(leg.get("advice") or leg.get("error")):
+            print(text)
+    print("\n🧳 打包清单：")
+    for item, advice in itinerary["packing_list"].items():
+        print(f"  • {item}: {'；'.join(advice)}")
+
+async def main(catalog=None):
+    """One interactive session. A long-running wrapper passes one shared
+    ``ToolCatalog`` so sessions reuse its warm MCP connections."""
+    print("👋 欢迎使用天气与穿搭助手！")
+    
+    # Step 1: Select city (or several, for a multi-city trip)
+    city = await select_city()
+    cities = city if isinstance(city, list) else None
+    print(f"\n✨ 已选择城市：{' → '.join(cities) if cities else city}")
+
+    # Free-text cities need the LLM to map them onto a tool call
+    direct = DIRECT_TOOL_CALLS and (cities is not None or city in CITIES)
+
+    async def run(catalog):
+        if cities:
+            await advise_itinerary(catalog, cities, direct)
+        else:
+            await advise(catalog, city, direct)
+
+    try:
+        with tracer.span("client.session", city=",".join(cities) if cities else city, direct=direct):
+            if catalog is not None:
+                await run(catalog)
+            else:
+                async with ToolCatalog(MCP_CONNECTIONS) as own_catalog:
+                    await run(own_catalog)
     except Exception as e:
         print(f"❌ 对话过程中出现错误：{e}")
+    if response_cache:
+        stats = response_cache.stats()
+        print(f"\n🗄️ LLM 响应缓存：命中 {stats['hits']} / 查询 {stats['lookups']}（{stats['entries']} 条）")
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,444 @@
+"""Load generator for server.py: MCP SSE tool calls and REST requests at once.
+
+Each of --concurrency workers draws operations from a weighted --mix and runs
+them back to back (closed loop), for --duration seconds or --requests
+operations per worker. Operations:
+
+    rest          POST /fashion-advice
+    mcp_weather   MCP get_weather
+    mcp_fashion   MCP get_fashion
+    mcp_itinerary MCP get_itinerary_advice for a 2-5 city trip (one call)
+
+MCP calls go over --transport: sse (a long-lived GET /sse stream plus
+POST /messages/ per session), streamable_http (POST /mcp), or both to run the
+load once per transport and compare them.
+
+The report (throughput, p50/p95/p99/max latency and error rate, overall and
+per operation) is printed as JSON and optionally written to --output for
+regression tracking. Against a server on this machine it also reports the
+peak number of established server-side connections (the connection
+footprint). Everything runs offline against a local server; pass
+--spawn-server to have the harness start and stop one itself:
+
+    python loadtest.py --spawn-server --concurrency 16 --duration 10 \\
+        --mix rest=2,mcp_weather=1,mcp_fashion=1 --output loadtest.json
+    python loadtest.py --spawn-server --transport both --stateless-http
+
+Overload: --upstream-latency-ms gives the spawned server a slow, uncached
+weather feed, --server-env sets its admission limits, and --deadline-ms sends
+each request's time budget (X-Request-Timeout-Ms / _meta.timeout_ms). With
+--expect-overload the run passes only if the excess load was turned away
+(HTTP 429/504, MCP queue_full/deadline_exceeded errors) and nothing else failed:
+
+    python loadtest.py --spawn-server --concurrency 64 --requests 20 \
+        --upstream-latency-ms 200 --deadline-ms 1000 --expect-overload \
+        --server-env CONCURRENCY_LIMITS=get_weather=4:8,/fashion-advice=4:8
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack, contextmanager
+from urllib.parse import urlsplit
+
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamable_http_client
+from travel_core.weather import FakeWeatherProvider
+
+CITIES = ["Copenhagen", "Beijing", "Berlin", "Paris", "Phuket", "Shanghai"]
+TIME_PERIODS = ["上午", "下午", "晚上", "凌晨"]
+STYLES = ["休闲", "商务", "优雅", "运动"]
+# What the server answers when admission control turns a call away
+REJECTIONS = {"http_429", "http_504", "queue_full", "deadline_exceeded"}
+OPERATIONS = ("rest", "mcp_weather", "mcp_fashion", "mcp_itinerary")
+TRANSPORTS = {"sse": "/sse", "streamable_http": "/mcp"}
+
+
+def slow_weather():
+    """WEATHER_PROVIDER factory for the spawned server under --upstream-latency-ms."""
+    return FakeWeatherProvider({city: (20, "多云") for city in CITIES},
+                               latency=float(os.environ["LOADTEST_UPSTREAM_LATENCY_MS"]) / 1000)
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = collections.Counter()
+        self.first_done = None
+        self.last_done = None
+
+    def record(self, started, error=None):
+        now = time.perf_counter()
+        if error is None:
+            self.latencies.append(now - started)
+        else:
+            self.errors[error] += 1
+        self.first_done = self.first_done or now
+        self.last_done = now
+
+    def summary(self, elapsed):
+        lat = sorted(self.latencies)
+        errors = sum(self.errors.values())
+        total = len(lat) + errors
+        ms = lambda seconds: round(seconds * 1000, 2)
+        return {
+            "requests": total,
+            "ok": len(lat),
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "error_kinds": dict(self.errors),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": ms(percentile(lat, 0.50)) if lat else None,
+            "p95_ms": ms(percentile(lat, 0.95)) if lat else None,
+            "p99_ms": ms(percentile(lat, 0.99)) if lat else None,
+            "max_ms": ms(lat[-1]) if lat else None,
+        }
+
+
+def parse_mix(text):
+    """"rest=2,mcp_weather=1" -> {"rest": 2.0, "mcp_weather": 1.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("mix needs at least one operation with a positive weight")
+    return mix
+
+
+def established_connections(port):
+    """Established TCP connections on local ``port`` (Linux), or None."""
+    count = 0
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    local, _, state = line.split()[1:4]
+                    count += state == "01" and int(local.rsplit(":", 1)[1], 16) == port
+        except OSError:
+            if table == "/proc/net/tcp":
+                return None
+    return count
+
+
+async def sample_peak(port, peak, stop):
+    while not stop.is_set():
+        current = established_connections(port)
+        if current is None:
+            return
+        peak[0] = max(peak[0] or 0, current)
+        try:
+            await asyncio.wait_for(stop.wait(), 0.1)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def scrape(http, metric):
+    """{labels: value} for one metric from the server's /metrics, or None if it has none."""
+    try:
+        response = await http.get("/metrics")
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+    values = {}
+    for line in response.text.splitlines():
+        if line.startswith(metric + "{"):
+            labels, _, value = line[len(metric):].rpartition(" ")
+            values[labels] = float(value)
+    return values
+
+
+async def sample_queue_depth(url, peak, stop):
+    # Own client, so sampling never waits behind the workers' capped pool
+    async with httpx.AsyncClient(base_url=url, timeout=5) as http:
+        while not stop.is_set():
+            depths = await scrape(http, "travel_queue_depth")
+            if depths is None:
+                return
+            peak[0] = max(peak[0], sum(depths.values()))
+            try:
+                await asyncio.wait_for(stop.wait(), 0.1)
+            except asyncio.TimeoutError:
+                pass
+
+
+class Worker:
+    def __init__(self, worker_id, http, mcp_http, mcp_url, transport, mix, seed, deadline_ms=None):
+        self.http = http
+        self.mcp_http = mcp_http
+        self.mcp_url = mcp_url
+        self.transport = transport
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.rng = random.Random(seed * 1000 + worker_id)
+        self.session = None
+        # The time budget sent with every call; the server gives up past it
+        self.headers = {"X-Request-Timeout-Ms": str(deadline_ms)} if deadline_ms else None
+        self.meta = {"timeout_ms": deadline_ms} if deadline_ms else None
+
+    async def open(self, stack):
+        if any(name.startswith("mcp_") for name in self.names):
+            if self.transport == "sse":
+                read, write = await stack.enter_async_context(sse_client(self.mcp_url))
+            else:
+                # Tool calls are ordinary requests on a connection pool shared by all sessions
+                read, write, _ = await stack.enter_async_context(
+                    streamable_http_client(self.mcp_url, http_client=self.mcp_http))
+            self.session = await stack.enter_async_context(ClientSession(read, write))
+            await self.session.initialize()
+
+    def profile(self):
+        rng = self.rng
+        return rng.choice(CITIES), rng.choice(TIME_PERIODS), rng.choice(STYLES), str(rng.randint(12, 70))
+
+    async def rest(self):
+        city, period, style, age = self.profile()
+        response = await self.http.post("/fashion-advice", json={
+            "city": city, "time_period": period, "style": style, "age": age}, headers=self.headers)
+        return None if response.status_code == 200 else f"http_{response.status_code}"
+
+    @staticmethod
+    def tool_error(result):
+        if not result.isError:
+            return None
+        text = " ".join(getattr(item, "text", "") for item in result.content)
+        return next((reason for reason in ("queue_full", "deadline_exceeded") if reason in text), "tool_error")
+
+    async def mcp_weather(self):
+        result = await self.session.call_tool("get_weather", {"location": self.rng.choice(CITIES)}, meta=self.meta)
+        return self.tool_error(result)
+
+    async def mcp_fashion(self):
+        city, period, style, age = self.profile()
+        result = await self.session.call_tool("get_fashion", {
+            "location": city, "temperature": f"{self.rng.randint(-5, 35)}C",
+            "time_period": period, "age": age, "style": style}, meta=self.meta)
+        return self.tool_error(result)
+
+    async def mcp_itinerary(self):
+        _, _, style, age = self.profile()
+        legs = [{"city": city, "time_period": self.rng.choice(TIME_PERIODS)}
+                for city in self.rng.sample(CITIES, self.rng.randint(2, 5))]
+        result = await self.session.call_tool("get_itinerary_advice", {"legs": legs, "age": age, "style": style},
+                                              meta=self.meta)
+        error = self.tool_error(result)
+        if error is None and len(json.loads(result.content[0].text)["legs"]) != len(legs):
+            error = "bad_itinerary"
+        return error
+
+    async def run(self, stats, keep_going):
+        done = 0
+        while keep_going(done):
+            name = self.rng.choices(self.names, self.weights)[0]
+            started = time.perf_counter()
+            try:
+                error = await getattr(self, name)()
+            except Exception as e:
+                error = type(e).__name__
+            stats[name].record(started, error)
+            done += 1
+
+
+async def run(args, transport):
+    stats = {name: Stats() for name in args.mix}
+    deadline = None
+
+    def keep_going(done):
+        return time.perf_counter() < deadline if args.duration else done < args.requests
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    # Streamable HTTP sessions share one pool; uncapped because stateful
+    # sessions also park a GET stream each, and with a long read timeout for it
+    mcp_limits = httpx.Limits(max_connections=None, max_keepalive_connections=args.concurrency)
+    async with (httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as http,
+                httpx.AsyncClient(timeout=httpx.Timeout(args.timeout, read=300), limits=mcp_limits) as mcp_http):
+        mcp_url = args.url + TRANSPORTS[transport]
+        workers = [Worker(i, http, mcp_http, mcp_url, transport, args.mix, args.seed, args.deadline_ms)
+                   for i in range(args.concurrency)]
+        opened = 0
+        all_open, start = asyncio.Event(), asyncio.Event()
+
+        async def drive(worker):
+            nonlocal opened
+            # Each task opens and closes its own MCP session (anyio scopes are
+            # task-bound); the clock starts once every session is open.
+            async with AsyncExitStack() as stack:
+                await worker.open(stack)
+                opened += 1
+                if opened == len(workers):
+                    all_open.set()
+                await start.wait()
+                await worker.run(stats, keep_going)
+
+        running = asyncio.gather(*(drive(worker) for worker in workers))
+        ready = asyncio.ensure_future(all_open.wait())
+        await asyncio.wait([ready, running], return_when=asyncio.FIRST_COMPLETED)
+        if running.done():
+            running.result()  # a session failed to open
+        url = urlsplit(args.url)
+        peak, stop_sampling = [None], asyncio.Event()
+        if url.hostname in ("localhost", "127.0.0.1", "::1"):
+            sampler = asyncio.ensure_future(sample_peak(url.port or 80, peak, stop_sampling))
+        else:
+            sampler = None
+        queue_peak = [0]
+        queue_sampler = asyncio.ensure_future(sample_queue_depth(args.url, queue_peak, stop_sampling))
+        started = time.perf_counter()
+        deadline = started + args.duration
+        start.set()
+        await running
+        elapsed = time.perf_counter() - started
+        stop_sampling.set()
+        if sampler:
+            await sampler
+        await queue_sampler
+        rejected = {labels: int(n) for labels, n in (await scrape(http, "travel_rejections_total") or {}).items()
+                    if n}
+
+    merged = Stats()
+    for s in stats.values():
+        merged.latencies += s.latencies
+        merged.errors.update(s.errors)
+    report = {
+        "config": {
+            "url": args.url,
+            "transport": transport,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "requests_per_worker": None if args.duration else args.requests,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "server_connections_peak": peak[0],
+        "server_queue_depth_peak": queue_peak[0],
+        "server_rejections": rejected,
+        "totals": merged.summary(elapsed),
+        "operations": {name: s.summary(elapsed) for name, s in stats.items()},
+    }
+    rest = stats.get("rest")
+    mcp = [s for name, s in stats.items() if name.startswith("mcp_") and s.first_done]
+    if rest and rest.first_done and mcp:
+        # Both surfaces were served concurrently if their completion windows overlap.
+        overlap = (min(rest.last_done, max(s.last_done for s in mcp))
+                   - max(rest.first_done, min(s.first_done for s in mcp)))
+        report["overlap_s"] = round(max(overlap, 0.0), 3)
+    return report
+
+
+def wait_until_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/openapi.json", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"server at {url} did not come up within {timeout}s")
+
+
+@contextmanager
+def local_server(port, extra_args=(), env=None):
+    """Run server.py on 127.0.0.1:port for the duration of the block."""
+    server = subprocess.Popen(
+        [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port), *extra_args],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(f"http://127.0.0.1:{port}", timeout=30)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="start server.py on --port (127.0.0.1) for the run and stop it afterwards")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-workers", type=int, default=1,
+                        help="worker processes for the spawned server (server.py --workers)")
+    parser.add_argument("--stateless-http", action="store_true",
+                        help="spawn the server with stateless streamable HTTP (server.py --stateless-http)")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="environment for the spawned server, e.g. CONCURRENCY_LIMITS=get_weather=4:8")
+    parser.add_argument("--upstream-latency-ms", type=float,
+                        help="give the spawned server a weather feed this slow, with caching off")
+    parser.add_argument("--deadline-ms", type=float,
+                        help="time budget sent with every request (X-Request-Timeout-Ms / _meta.timeout_ms)")
+    parser.add_argument("--expect-overload", action="store_true",
+                        help="pass only if some calls were rejected by admission control and no other errors")
+    parser.add_argument("--transport", choices=[*TRANSPORTS, "both"], default="sse",
+                        help="MCP transport for the mcp_* operations")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=0, help="seconds to run; 0 uses --requests")
+    parser.add_argument("--requests", type=int, default=50, help="operations per worker")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("rest=1,mcp_weather=1,mcp_fashion=1"),
+                        help="weighted operations, e.g. rest=2,mcp_weather=1,mcp_fashion=1")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request HTTP timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="exit non-zero if the overall error rate exceeds this")
+    args = parser.parse_args()
+
+    transports = list(TRANSPORTS) if args.transport == "both" else [args.transport]
+    server_args = ["--workers", str(args.server_workers)] + (["--stateless-http"] if args.stateless_http else [])
+    server_env = dict(item.split("=", 1) for item in args.server_env)
+    if args.upstream_latency_ms:
+        server_env.update(WEATHER_PROVIDER="loadtest:slow_weather", WEATHER_CACHE_TTL="0",
+                          WEATHER_CACHE_STALE_TTL="0", LOADTEST_UPSTREAM_LATENCY_MS=str(args.upstream_latency_ms))
+
+    def run_all():
+        return {transport: asyncio.run(run(args, transport)) for transport in transports}
+
+    if args.spawn_server:
+        with local_server(args.port, server_args, server_env) as args.url:
+            reports = run_all()
+    else:
+        reports = run_all()
+
+    # One report per run; "both" prints them side by side, keyed by transport
+    result = reports if len(reports) > 1 else reports[transports[0]]
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    for transport, report in reports.items():
+        if args.expect_overload:
+            kinds = report["totals"]["error_kinds"]
+            if not kinds.keys() & REJECTIONS:
+                raise SystemExit(f"overload test failed over {transport}: nothing was rejected")
+            if kinds.keys() - REJECTIONS:
+                raise SystemExit(f"overload test failed over {transport}: unexpected errors {kinds}")
+            continue
+        if report["totals"]["error_rate"] > args.max_error_rate:
+            raise SystemExit(f"load test failed over {transport}: error rate "
+                             f"{report['totals']['error_rate']} > {args.max_error_rate}")
+        if report.get("overlap_s") == 0:
+            raise SystemExit(f"load test failed over {transport}: REST and MCP requests were not served concurrently")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Pre-fork multi-process mode for server.py.
+
+    python server.py --workers 4
+
+The parent process imports server.py once, so the fashion tables, city data
+and the app itself are built before forking and shared copy-on-write with
+every worker (gc.freeze() keeps the collector from writing to, and so
+copying, those pages). All workers accept on one shared listening socket, so
+REST requests and MCP tool calls spread across cores. The parent restarts
+workers that die and stops them all on SIGTERM/SIGINT.
+
+An MCP SSE session lives in the worker that accepted GET /sse, but the
+client's POST /messages/ for it can land on any worker. StickySessionMiddleware
+tags the message endpoint a worker hands out with its index
+(/messages/w2/?session_id=...), and the other workers forward such posts to
+worker 2 over its private unix socket. Streamable HTTP (/mcp) is served
+statelessly in this mode, so any worker can answer any request.
+
+Metrics served at /metrics are per worker process.
+"""
+import gc
+import logging
+import logging.config
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import signal
+import socket
+import tempfile
+
+import httpx
+import uvicorn
+
+logger = logging.getLogger("uvicorn.error")
+
+# Headers not to copy between a forwarded message post and its response; Host
+# is kept because the MCP transport validates it
+HOP_HEADERS = {b"connection", b"content-length", b"transfer-encoding", b"keep-alive"}
+
+
+class StickySessionMiddleware:
+    """Route MCP SSE message posts to the worker that owns the session."""
+
+    def __init__(self, app, index: int, peers: list[str], sse_path="/sse", message_path="/messages/"):
+        self.app = app
+        self.index = index
+        self.peers = peers
+        self.sse_path = sse_path
+        self.message_path = message_path
+        self._endpoint = f"data: {message_path}".encode()
+        self._tagged = f"data: {message_path}w{index}/".encode()
+        self._clients = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        path = scope["path"]
+        if path == self.sse_path:
+            return await self.app(scope, receive, self._tag_endpoint(send))
+        if path.startswith(self.message_path + "w"):
+            worker = path[len(self.message_path) + 1:].rstrip("/")
+            if worker.isdigit() and int(worker) < len(self.peers):
+                if int(worker) != self.index:
+                    return await self._forward(int(worker), scope, receive, send)
+                scope = dict(scope, path=self.message_path, raw_path=self.message_path.encode())
+        return await self.app(scope, receive, send)
+
+    def _tag_endpoint(self, send):
+        # The endpoint event is the first thing the SSE stream sends
+        tagged = False
+
+        async def send_tagged(message):
+            nonlocal tagged
+            if not tagged and message["type"] == "http.response.body" and self._endpoint in message.get("body", b""):
+                message = {**message, "body": message["body"].replace(self._endpoint, self._tagged, 1)}
+                tagged = True
+            await send(message)
+        return send_tagged
+
+    async def _forward(self, worker, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        client = self._clients.get(worker)
+        if client is None:
+            client = self._clients[worker] = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(uds=self.peers[worker]), base_url="http://worker")
+        headers = [(k, v) for k, v in scope["headers"] if k.lower() not in HOP_HEADERS]
+        url = scope["path"] + ("?" + scope["query_string"].decode("latin-1") if scope["query_string"] else "")
+        try:
+            response = await client.request(scope["method"], url, content=bytes(body), headers=headers)
+        except httpx.HTTPError as e:
+            logger.warning("forwarding to worker %d failed: %s", worker, e)
+            await send({"type": "http.response.start", "status": 502, "headers": []})
+            await send({"type": "http.response.body", "body": b"Session worker unavailable"})
+            return
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [(k, v) for k, v in response.headers.raw if k.lower() not in HOP_HEADERS],
+        })
+        await send({"type": "http.response.body", "body": response.content})
+
+
+def _run_worker(app, index, peers, sockets, graceful_timeout):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(StickySessionMiddleware(app, index, peers),
+                            timeout_graceful_shutdown=graceful_timeout)
+    uvicorn.Server(config).run(sockets=sockets)
+    # Forked children skip atexit handlers, so flush buffered spans here
+    from travel_core.tracing import get_tracer
+    tracer = get_tracer()
+    if tracer.enabled:
+        tracer.exporter.flush()
+
+
+def serve(app, host: str, port: int, workers: int, graceful_timeout: float = 10.0):
+    """Run ``app`` in ``workers`` forked processes until SIGTERM/SIGINT."""
+    logging.config.dictConfig(uvicorn.config.LOGGING_CONFIG)
+    # Everything allocated so far is shared with the workers; keep it out of GC passes
+    gc.freeze()
+    shared = socket.create_server((host, port), backlog=2048)
+    rundir = tempfile.mkdtemp(prefix="weatherfashion-")
+    peers = [os.path.join(rundir, f"w{i}.sock") for i in range(workers)]
+    private = []
+    for path in peers:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        sock.listen(128)
+        private.append(sock)
+
+    context = multiprocessing.get_context("fork")
+
+    def spawn(index):
+        process = context.Process(target=_run_worker, name=f"worker-{index}",
+                                  args=(app, index, peers, [shared, private[index]], graceful_timeout))
+        process.start()
+        return process
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("Serving on http://%s:%d with %d workers", host, port, workers)
+    processes = [spawn(i) for i in range(workers)]
+    try:
+        while not stopping:
+            multiprocessing.connection.wait([p.sentinel for p in processes], timeout=1.0)
+            for index, process in enumerate(processes):
+                if not stopping and not process.is_alive():
+                    logger.warning("worker %d exited with %s; restarting", index, process.exitcode)
+                    processes[index] = spawn(index)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(graceful_timeout + 5)
+            if process.is_alive():
+                process.kill()
+        for sock in (shared, *private):
+            sock.close()
+        shutil.rmtree(rundir, ignore_errors=True)
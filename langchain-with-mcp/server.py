@@ -1,10 +1,27 @@
-from mcp.server.fastmcp import FastMCP
-from fastapi import FastAPI, HTTPException
+from mcp.server.fastmcp import Context, FastMCP
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import json
+import argparse
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
 
-app = FastAPI()
+from travel_core import codec, fashion, limits, metrics
+from travel_core.tracing import TraceMiddleware, get_tracer
+from travel_core.weather import CachedWeatherProvider, StaticWeatherProvider, UnknownLocationError, load_provider
+
+@asynccontextmanager
+async def lifespan(app):
+    # The streamable HTTP transport's session manager runs for the app's lifetime
+    async with mcp.session_manager.run():
+        yield
+
+app = FastAPI(lifespan=lifespan)
+# Spans go to TRAVEL_TRACE_FILE when it is set (see travel_core.tracing)
+tracer = get_tracer()
 
 # Add CORS middleware
 app.add_middleware(
@@ -14,6 +31,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# One server span per HTTP request, including the MCP /sse and /messages/ endpoints
+app.add_middleware(TraceMiddleware, tracer=tracer)
 
 class FashionRequest(BaseModel):
     city: str
@@ -21,340 +40,450 @@ class FashionRequest(BaseModel):
     style: str
     age: str
 
+MAX_BATCH_SIZE = 500
+MAX_ITINERARY_LEGS = 20
+
+class ItineraryLeg(BaseModel):
+    city: str
+    date: str = ""
+    time_period: str = "下午"
+
+# Mock weather feed; set WEATHER_PROVIDER=package.module:factory to plug in a
+# real one. Lookups go through a TTL cache with request coalescing and
+# stale-while-revalidate (see travel_core.weather).
+CITY_WEATHER = {
+    "Copenhagen": (18, "多云"),
+    "Beijing": (25, "晴朗"),
+    "Berlin": (20, "晴空万里"),
+    "Paris": (22, "阴天"),
+    "Phuket": (32, "热带气候"),
+    "Shanghai": (28, "潮湿"),
+}
+weather_provider = CachedWeatherProvider(
+    load_provider(os.environ["WEATHER_PROVIDER"]) if os.getenv("WEATHER_PROVIDER")
+    else StaticWeatherProvider(CITY_WEATHER),
+    ttl=float(os.getenv("WEATHER_CACHE_TTL", "300")),
+    stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "3600")),
+)
+
+# Operational metrics, served at /metrics. Recording is per-thread and lock-free
+# (see travel_core.metrics and benchmarks/metrics.py).
+REQUESTS = metrics.Counter("travel_requests_total", "MCP tool calls and HTTP requests handled",
+                           ["kind", "name", "outcome"])
+LATENCY = metrics.Histogram("travel_request_duration_seconds", "MCP tool call and HTTP request latency",
+                            ["kind", "name"])
+IN_FLIGHT = metrics.Gauge("travel_requests_in_flight", "MCP tool calls and HTTP requests in progress",
+                          ["kind", "name"])
+ERRORS = metrics.Counter("travel_errors_total", "Errors by type", ["type"])
+CACHE_LOOKUPS = metrics.Counter("travel_cache_lookups_total", "Cache lookups by result", ["cache", "result"])
+CACHE_HIT_RATIO = metrics.Gauge("travel_cache_hit_ratio", "Share of cache lookups served from the cache",
+                                ["cache"])
+for result, stat in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses")):
+    CACHE_LOOKUPS.labels("weather", result).set_function(lambda stat=stat: weather_provider.stats()[stat])
+CACHE_HIT_RATIO.labels("weather").set_function(lambda: weather_provider.stats()["hit_rate"])
+
+_series = {}
+
+class observed:
+    """Count, time and track in-flight calls of one tool or route.
+
+    Use as a context manager, or call ``finish`` when the work outlives the
+    handler (streaming responses).
+    """
+    __slots__ = ("series", "started")
+
+    def __init__(self, kind: str, name: str):
+        # (in-flight, latency, ok count, error count), resolved once per tool/route
+        self.series = _series.get((kind, name)) or _series.setdefault((kind, name), (
+            IN_FLIGHT.labels(kind, name), LATENCY.labels(kind, name),
+            REQUESTS.labels(kind, name, "ok"), REQUESTS.labels(kind, name, "error")))
+        self.series[0].inc()
+        self.started = time.perf_counter()
+
+    def finish(self, ok: bool):
+        in_flight, latency, ok_count, error_count = self.series
+        in_flight.dec()
+        latency.observe(time.perf_counter() - self.started)
+        (ok_count if ok else error_count).inc()
+
+    @staticmethod
+    def reject(kind: str, name: str):
+        """Count a call turned away before any work started (no latency or in-flight)."""
+        REQUESTS.labels(kind, name, "error").inc()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(exc_type is None)
+
+@contextmanager
+def counting_input_errors():
+    """Count bad client input to the fashion core by type, then re-raise."""
+    try:
+        yield
+    except fashion.UnknownTimePeriod:
+        ERRORS.labels("bad_time_period").inc()
+        raise
+    except ValueError:
+        ERRORS.labels("bad_temperature").inc()
+        raise
+
+class StreamFailed(Exception):
+    """Raised by a response stream after it has sent the client an error event."""
+
+async def _observed_stream(call: observed, chunks, release=None):
+    # Streaming responses are measured (and hold their concurrency slot) until
+    # their last chunk is sent
+    ok = False
+    try:
+        async for chunk in chunks:
+            yield chunk
+        ok = True
+    except StreamFailed:
+        pass  # the client already has the error; count it, end the stream cleanly
+    finally:
+        call.finish(ok)
+        if release is not None:
+            release()
+
+# Admission control (see travel_core.limits): each tool and route runs at most
+# MAX_CONCURRENCY calls at once with up to MAX_QUEUE more waiting, and turns
+# the rest away at once (HTTP 429, or an MCP tool error). Override per tool or
+# route with CONCURRENCY_LIMITS="get_fashion=8:16,/fashion-advice=32".
+# Clients send their remaining time budget (X-Request-Timeout-Ms header, or
+# _meta.timeout_ms on tools/call); calls without one get REQUEST_TIMEOUT_MS.
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "64"))
+MAX_QUEUE = int(os.getenv("MAX_QUEUE", "128"))
+CONCURRENCY_LIMITS = limits.parse_limits(os.getenv("CONCURRENCY_LIMITS", ""))
+REQUEST_TIMEOUT_MS = float(os.getenv("REQUEST_TIMEOUT_MS", "30000"))
+QUEUE_DEPTH = metrics.Gauge("travel_queue_depth", "Calls waiting for a concurrency slot", ["name"])
+REJECTIONS = metrics.Counter("travel_rejections_total", "Calls turned away: queue full or deadline exceeded",
+                             ["name", "reason"])
+
+_limiters = {}
+
+def limiter(name: str) -> limits.ConcurrencyLimiter:
+    slots = _limiters.get(name)
+    if slots is None:
+        limit, queue = CONCURRENCY_LIMITS.get(name, (MAX_CONCURRENCY, None))
+        slots = _limiters[name] = limits.ConcurrencyLimiter(name, limit, MAX_QUEUE if queue is None else queue)
+        QUEUE_DEPTH.labels(name).set_function(lambda: slots.queued)
+        for reason in ("queue_full", "deadline_exceeded"):
+            REJECTIONS.labels(name, reason).set_function(lambda reason=reason: slots.rejected[reason])
+    return slots
+
+def deadline(timeout_ms=None):
+    return limits.deadline_after(REQUEST_TIMEOUT_MS if timeout_ms is None else timeout_ms)
+
+def tool_deadline():
+    meta = mcp.get_context().request_context.meta
+    return deadline(getattr(meta, "timeout_ms", None))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="WeatherFashion MCP (SSE) + REST server")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="worker processes; more than 1 pre-forks workers that share the "
+                             "precomputed tables and route MCP sessions stickily (see prefork.py)")
+    parser.add_argument("--stateless-http", action="store_true",
+                        default=os.getenv("MCP_STATELESS_HTTP", "0") != "0",
+                        help="serve streamable HTTP (/mcp) without sessions, so any worker or "
+                             "replica can answer any request (always on with --workers > 1)")
+    return parser.parse_args(argv)
+
+# Flags (or their environment defaults when imported) are read before FastMCP
+# is built, since its streamable HTTP session manager fixes the mode then.
+# Streamable HTTP sessions live in one process and are not routed stickily,
+# so they are stateless with --stateless-http or more than one worker.
+args = parse_args(None if __name__ == "__main__" else [])
+
 # Create a single MCP server with both tools
-mcp = FastMCP("WeatherFashion")
+mcp = FastMCP("WeatherFashion", stateless_http=args.stateless_http or args.workers > 1)
 
-@mcp.tool()
-async def get_weather(location: str) -> str:
-    weather_data = {
-        "Copenhagen": {"temperature": "18C", "description": "多云"},
-        "Beijing": {"temperature": "25C", "description": "晴朗"},
-        "Berlin": {"temperature": "20C", "description": "晴空万里"},
-        "Paris": {"temperature": "22C", "description": "阴天"},
-        "Phuket": {"temperature": "32C", "description": "热带气候"},
-        "Shanghai": {"temperature": "28C", "description": "潮湿"}
-    }
+class JSONBytesResponse(Response):
+    """Like FastAPI's ORJSONResponse, but falls back to the stdlib encoder
+    when orjson is not installed (see travel_core.codec)."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return codec.dumps(content)
 
+# Internal helpers return dicts; the MCP tools and HTTP routes serialize once.
+async def weather_info(location: str) -> dict:
     try:
-        if location not in weather_data:
-            return json.dumps({
-                "error": f"没有{location}的天气数据。可用城市：{', '.join(weather_data.keys())}",
-                "location": location,
-            })
-
-        data = weather_data[location]
-        response = {
+        report = await weather_provider.get(location)
+        return {
+            "location": location,
+            "temperature": f"{report.temperature:g}C",
+            "description": report.description,
+        }
+    except UnknownLocationError as e:
+        ERRORS.labels("unknown_city").inc()
+        return {
+            "error": f"没有{location}的天气数据。可用城市：{', '.join(e.available)}",
             "location": location,
-            "temperature": data["temperature"],
-            "description": data["description"],
         }
-
-        return json.dumps(response, ensure_ascii=False)
     except Exception as e:
-        return json.dumps({
+        ERRORS.labels("weather_upstream").inc()
+        return {
             "error": f"发生错误：{str(e)}",
             "location": location,
-        })
+        }
 
 @mcp.tool()
-async def get_fashion(location: str, temperature: str, time_period: str = "下午", age: str = "25", style: str = "休闲") -> str:
-    # Parse temperature
-    temp_value = float(temperature.replace("C", ""))
-    
-    # Adjust temperature perception based on time period
-    temp_adjustments = {
-        "上午": -2,  # 早上感觉较凉
-        "下午": 0,   # 基准温度
-        "晚上": -3,  # 晚上较凉
-        "凌晨": -5   # 最冷
-    }
-    adjusted_temp = temp_value + temp_adjustments.get(time_period, 0)
-
-    # Get age group specific modifications
-    try:
-        age_num = int(age)
-        if age_num < 18:
-            age_group = "teen"
-        elif age_num < 30:
-            age_group = "young"
-        elif age_num < 50:
-            age_group = "adult"
-        else:
-            age_group = "senior"
-    except ValueError:
-        age_group = "adult"
-
-    # Basic advice based on adjusted temperature and time period
-    if adjusted_temp < 10:
-        base_clothing = {
-            "休闲": {
-                "外套": "保暖羽绒服或休闲羊毛大衣",
-                "上装": "厚毛衣或连帽衫",
-                "下装": "保暖牛仔裤或保暖裤",
-                "配饰": "毛线帽和保暖围巾",
-                "鞋子": "保暖运动鞋或靴子"
-            },
-            "商务": {
-                "外套": "羊毛大衣或风衣",
-                "上装": "西装搭配保暖内衣",
-                "下装": "羊毛西裤",
-                "配饰": "皮手套和羊绒围巾",
-                "鞋子": "皮靴或皮鞋"
-            },
-            "优雅": {
-                "外套": "长款羊绒大衣",
-                "上装": "高领毛衣搭配西装外套",
-                "下装": "羊毛西裤或长裙",
-                "配饰": "设计师围巾和皮手套",
-                "鞋子": "高跟靴或正装鞋"
-            },
-            "运动": {
-                "外套": "保暖运动夹克",
-                "上装": "保暖内衣搭配抓绒衣",
-                "下装": "保暖运动裤",
-                "配饰": "运动帽和保暖围脖",
-                "鞋子": "保暖跑鞋"
-            }
-        }
-    elif adjusted_temp < 20:
-        base_clothing = {
-            "休闲": {
-                "外套": "轻薄牛仔夹克或连帽衫",
-                "上装": "长袖T恤或轻薄毛衣",
-                "下装": "牛仔裤或休闲裤",
-                "配饰": "轻薄围巾或帽子",
-                "鞋子": "运动鞋或休闲鞋"
-            },
-            "商务": {
-                "外套": "轻薄西装外套",
-                "上装": "衬衫或女式衬衫",
-                "下装": "西裤或铅笔裙",
-                "配饰": "轻薄围巾或口袋方巾",
-                "鞋子": "正装鞋或乐福鞋"
-            },
-            "优雅": {
-                "外套": "轻薄风衣或设计师夹克",
-                "上装": "丝质衬衫或精致针织衫",
-                "下装": "修身裤或中长裙",
-                "配饰": "丝巾或精致首饰",
-                "鞋子": "高跟鞋或设计师平底鞋"
-            },
-            "运动": {
-                "外套": "轻薄运动夹克或防风衣",
-                "上装": "速干长袖",
-                "下装": "运动裤或短裤",
-                "配饰": "运动帽或头带",
-                "鞋子": "跑鞋或训练鞋"
-            }
-        }
-    else:
-        base_clothing = {
-            "休闲": {
-                "外套": "可选轻薄夹克",
-                "上装": "T恤或短袖衬衫",
-                "下装": "短裤或轻薄长裤",
-                "配饰": "太阳镜和帽子",
-                "鞋子": "轻便运动鞋或凉鞋"
-            },
-            "商务": {
-                "外套": "轻薄西装外套（可选）",
-                "上装": "短袖衬衫或女式衬衫",
-                "下装": "轻薄西裤或裙子",
-                "配饰": "口袋方巾或轻薄围巾",
-                "鞋子": "透气正装鞋"
-            },
-            "优雅": {
-                "外套": "轻薄开衫或披肩",
-                "上装": "无袖衬衫或轻薄丝质上衣",
-                "下装": "轻薄面料长裤或夏季连衣裙",
-                "配饰": "精致首饰或丝巾",
-                "鞋子": "露趾高跟鞋或优雅凉鞋"
-            },
-            "运动": {
-                "外套": "超轻运动夹克",
-                "上装": "速干背心或T恤",
-                "下装": "运动短裤或裙裤",
-                "配饰": "遮阳帽和运动头带",
-                "鞋子": "透气跑鞋"
-            }
-        }
+async def get_weather(location: str) -> str:
+    async with limiter("get_weather").admit(tool_deadline()):
+        with tracer.span("mcp.tool get_weather", location=location), observed("tool", "get_weather"):
+            return codec.dumps_str(await weather_info(location))
 
-    # Get style-specific clothing
-    style_clothing = base_clothing.get(style, base_clothing["休闲"])
-
-    # Time-specific adjustments
-    time_specific_tips = {
-        "上午": {
-            "teen": "早上较凉，注意分层穿搭。别忘了带上学校/活动用的包！",
-            "young": "选择可以随着天气变暖逐层脱下的衣物。",
-            "adult": "专业的早晨着装，注意温度变化时的分层。",
-            "senior": "容易脱换的保暖层次，搭配舒适的步行鞋。"
-        },
-        "下午": {
-            "teen": "适合活动和社交的舒适时尚装扮。",
-            "young": "适合工作/休闲活动的平衡搭配。",
-            "adult": "适合会议/活动的专业舒适着装。",
-            "senior": "轻薄透气的衣物，注意防晒。"
-        },
-        "晚上": {
-            "teen": "和朋友晚上活动时添加一件轻薄外套。",
-            "young": "适合晚间社交活动或晚餐的时尚装扮。",
-            "adult": "适合晚餐或活动的优雅晚装。",
-            "senior": "保暖舒适的晚间装扮，注意保温。"
-        },
-        "凌晨": {
-            "teen": "夜间外出时注意保暖和可见度。",
-            "young": "夜间活动时既时尚又保暖的装扮。",
-            "adult": "夜间活动的优雅保暖着装。",
-            "senior": "夜间额外的保暖层次，注重舒适。"
-        }
-    }
-
-    # City-specific advice with time period considerations
-    city_specific = {
-        "Copenhagen": {
-            "城市特点": "北欧时尚之都，极简主义风格",
-            "穿衣风格": "简约优雅，主要以黑、白、灰为主",
-            "文化建议": "保守着装，注重环保意识",
-            "特别提示": {
-                "上午": "清晨较凉，尤其靠近水域时注意保暖",
-                "下午": "大多数场合适合商务休闲装",
-                "晚上": "晚间活动添加时尚外层",
-                "凌晨": "保暖层次和反光细节注意安全"
-            },
-            "适合场所": "设计博物馆、新港、小美人鱼雕像",
-            "禁忌": "避免过于花哨的装扮"
-        },
-        "Beijing": {
-            "城市特点": "现代与传统并存的国际大都市",
-            "穿衣风格": "优雅实用",
-            "文化建议": "参观景点时着装正式",
-            "特别提示": {
-                "上午": "注意分层穿搭和空气质量",
-                "下午": "建议防晒和戴口罩",
-                "晚上": "餐饮娱乐场所适合商务休闲装",
-                "凌晨": "夜间较凉注意保暖"
-            },
-            "适合场所": "故宫、长城、胡同",
-            "禁忌": "参观寺庙时避免暴露着装"
-        },
-        "Berlin": {
-            "城市特点": "前卫艺术与历史文化的融合",
-            "穿衣风格": "个性化，街头风格流行",
-            "文化建议": "着装可以大胆创新",
-            "特别提示": {
-                "上午": "清晨较凉注意保暖",
-                "下午": "街头风格适合大多数场合",
-                "晚上": "创意前卫的晚装",
-                "凌晨": "夜店跳舞注意保暖"
-            },
-            "适合场所": "博物馆岛、勃兰登堡门、东边画廊",
-            "禁忌": "参观纪念馆时避免不当着装"
-        },
-        "Paris": {
-            "城市特点": "全球时尚之都",
-            "穿衣风格": "优雅时尚，注重细节",
-            "文化建议": "偏向正式优雅",
-            "特别提示": {
-                "上午": "早晨咖啡馆适合时尚休闲装",
-                "下午": "购物时间优雅日装",
-                "晚上": "晚餐和活动需要盛装",
-                "凌晨": "精致的夜间着装"
-            },
-            "适合场所": "埃菲尔铁塔、卢浮宫、香榭丽舍大街",
-            "禁忌": "正式场合避免运动装"
-        },
-        "Phuket": {
-            "城市特点": "热带岛屿度假胜地",
-            "穿衣风格": "轻便凉爽，度假风格",
-            "文化建议": "注意泰国文化礼仪",
-            "特别提示": {
-                "上午": "活动时穿着轻便透气",
-                "下午": "防晒必不可少",
-                "晚上": "晚餐时间商务休闲装",
-                "凌晨": "晚风轻薄层次"
-            },
-            "适合场所": "海滩、寺庙、夜市",
-            "禁忌": "参观寺庙时着装得体"
-        },
-        "Shanghai": {
-            "城市特点": "现代国际大都市",
-            "穿衣风格": "时尚前卫，融合东西方元素",
-            "文化建议": "着装可以时尚大胆",
-            "特别提示": {
-                "上午": "商务区适合正装",
-                "下午": "前卫时尚的日装",
-                "晚上": "潮流晚装",
-                "凌晨": "夜生活时尚层次"
-            },
-            "适合场所": "外滩、豫园、田子坊",
-            "禁忌": "特殊场合避免过于休闲的着装"
-        }
-    }
-
-    # Get city-specific information
-    city_info = city_specific.get(location, {
-            "城市特点": "请查看当地特点",
-            "穿衣风格": "建议了解当地穿衣习惯",
-            "文化建议": "注意当地文化",
-            "特别提示": {
-                "上午": "查看当地早晨天气",
-                "下午": "了解当地下午情况",
-                "晚上": "了解当地晚间活动",
-                "凌晨": "了解当地夜间情况"
-            },
-            "适合场所": "请查看当地旅游信息",
-            "禁忌": "注意着装得体"
-    })
-
-    # Combine response
-    response = {
-        "Location": location,
-        "Time Period": time_period,
-        "Temperature": {
-            "Actual": temperature,
-            "Feels Like": f"{adjusted_temp}C"
-        },
-        "User Profile": {
-            "Age Group": age_group,
-            "Style Preference": style
-        },
-        "Clothing Recommendations": style_clothing,
-        "Time-Specific Advice": time_specific_tips[time_period][age_group],
-        "City-Specific Advice": city_info,
-        "天气提醒": f"当前{time_period}体感温度{adjusted_temp}度，" + (
-            "请注意保暖" if adjusted_temp < 10 else
-            "温度适中" if adjusted_temp < 20 else
-            "请注意防晒降温"
-        )
-    }
+@mcp.tool()
+async def get_fashion(location: str, temperature: str, time_period: str = "下午", age: str = "25", style: str = "休闲", description: str = "") -> str:
+    # Recommendation tables are precompiled once in travel_core.fashion; this
+    # only assembles the cached JSON fragments for the requested combination.
+    async with limiter("get_fashion").admit(tool_deadline()):
+        with tracer.span("mcp.tool get_fashion", location=location, temperature=temperature), \
+                observed("tool", "get_fashion"), counting_input_errors():
+            return fashion.render_detailed(location, temperature, time_period, age, style, description)
 
-    return json.dumps(response, ensure_ascii=False, indent=2)
+@mcp.tool()
+async def get_fashion_stream(ctx: Context, location: str, temperature: str, time_period: str = "下午", age: str = "25", style: str = "休闲", description: str = "") -> str:
+    """Same advice as get_fashion, streamed section by section.
 
-@app.post("/fashion-advice")
-async def fashion_advice(request: FashionRequest):
-    try:
-        # Get weather data
-        weather_result = await get_weather(request.city)
-        weather_data = json.loads(weather_result)
-        
-        if "error" in weather_data:
-            raise HTTPException(status_code=400, detail=weather_data["error"])
-        
-        # Get fashion advice
-        fashion_result = await get_fashion(
+    Each section (profile, clothing, time tips, city advice, reminder) is sent as
+    soon as it is ready as a progress notification whose message is one JSON
+    object. The result is the complete get_fashion document.
+    """
+    async with limiter("get_fashion_stream").admit(tool_deadline()):
+        with tracer.span("mcp.tool get_fashion_stream", location=location, temperature=temperature) as span, \
+                observed("tool", "get_fashion_stream"), counting_input_errors():
+            total = 1 + len(fashion.DETAILED_SECTIONS)  # header + sections
+            sections = fashion.detailed_sections(location, temperature, time_period, age, style, description)
+            for i, section in enumerate(sections, 1):
+                await ctx.report_progress(i, total, message=section)
+                span.add_event("section sent", index=i)
+            return fashion.render_detailed(location, temperature, time_period, age, style, description)
+
+async def _weather(city: str) -> dict:
+    weather_data = await weather_info(city)
+    if "error" in weather_data:
+        raise ValueError(weather_data["error"])
+    return weather_data
+
+def _check_time_period(request: FashionRequest):
+    # Before the weather lookup or any streamed section: a bad period is a 400
+    with counting_input_errors():
+        fashion.check_time_period(request.time_period)
+
+async def _advise(request: FashionRequest) -> dict:
+    _check_time_period(request)
+    # Get weather data
+    weather_data = await _weather(request.city)
+
+    # Get fashion advice
+    with counting_input_errors():
+        return fashion.detailed_advice(
             location=request.city,
             temperature=weather_data["temperature"],
             time_period=request.time_period,
             age=request.age,
-            style=request.style
+            style=request.style,
+            description=weather_data["description"]
         )
-        
-        return json.loads(fashion_result)
+
+def _advise_city(city: str, weather_data: dict, time_periods: list[str], ages: list[str],
+                 styles: list[str]) -> list[dict]:
+    """get_fashion advice for many requests in one city: {"result": ...} or {"error": ...} each.
+
+    All of them are classified in one fashion.recommend_many pass; requests that
+    end up with the same recommendation (e.g. ages in one age group) share one
+    advice dict.
+    """
+    temperature, description = weather_data["temperature"], weather_data["description"]
+    try:
+        with counting_input_errors():
+            recommendations = fashion.recommend_many(
+                [temperature] * len(time_periods), time_periods, ages, styles, city)
+    except ValueError as e:
+        return [{"error": str(e)}] * len(time_periods)
+    outcomes, advice = [], {}
+    for recommendation, style in zip(recommendations, styles):
+        key = (recommendation, style)  # the profile echoes the requested style
+        if key not in advice:
+            try:
+                with counting_input_errors():
+                    advice[key] = {"result": fashion.detailed_advice_for(
+                        recommendation, city, temperature, style, description)}
+            except fashion.UnknownTimePeriod as e:
+                advice[key] = {"error": str(e)}
+        outcomes.append(advice[key])
+    return outcomes
+
+async def _advise_batch(requests: list[FashionRequest]):
+    """Yield one NDJSON line per request as soon as the weather for its city is in."""
+    cities = {}
+    for index, request in enumerate(requests):
+        cities.setdefault(request.city, []).append(index)
+    tasks = {asyncio.ensure_future(_weather(city)): (city, indices) for city, indices in cities.items()}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                city, indices = tasks[task]
+                try:
+                    batch = [requests[index] for index in indices]
+                    outcomes = _advise_city(city, task.result(), [r.time_period for r in batch],
+                                            [r.age for r in batch], [r.style for r in batch])
+                except Exception as e:
+                    outcomes = [{"error": str(e)}] * len(indices)
+                for index, payload in zip(indices, outcomes):
+                    yield codec.dumps({"index": index, **payload}) + b"\n"
+    finally:
+        for task in pending:
+            task.cancel()
+
+@mcp.tool()
+async def get_fashion_batch(requests: list[FashionRequest], ctx: Context) -> str:
+    """Get fashion advice for many (city, time_period, style, age) requests in one call.
+
+    Identical requests are computed once. Each request's NDJSON line (its "index"
+    and either a "result" or an "error") is sent as a progress notification
+    message as soon as it is ready, like get_fashion_stream's sections. The result
+    is all the lines, in completion order.
+    """
+    if len(requests) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} requests per batch")
+    async with limiter("get_fashion_batch").admit(tool_deadline()):
+        with tracer.span("mcp.tool get_fashion_batch", requests=len(requests)), \
+                observed("tool", "get_fashion_batch"):
+            lines = []
+            async for line in _advise_batch(requests):
+                lines.append(line)
+                await ctx.report_progress(len(lines), len(requests), message=line.decode().rstrip("\n"))
+            return b"".join(lines).decode()
+
+async def _itinerary(legs: list[ItineraryLeg], age: str, style: str) -> dict:
+    """Advice for every leg of a trip; the weather for all its cities is looked up at once."""
+    cities = list(dict.fromkeys(leg.city for leg in legs))
+    weather = dict(zip(cities, await asyncio.gather(*map(weather_info, cities))))
+    stops = [{"city": leg.city, "date": leg.date, "time_period": leg.time_period} for leg in legs]
+    for city in cities:
+        indices = [index for index, leg in enumerate(legs) if leg.city == city]
+        if "error" in weather[city]:
+            outcomes = [{"error": weather[city]["error"]}] * len(indices)
+        else:
+            outcomes = _advise_city(city, weather[city], [legs[index].time_period for index in indices],
+                                    [age] * len(indices), [style] * len(indices))
+        for index, outcome in zip(indices, outcomes):
+            if "result" in outcome:
+                stops[index]["advice"] = outcome["result"]
+            else:
+                stops[index]["error"] = outcome["error"]
+    packing = fashion.packing_list(stop["advice"]["Clothing Recommendations"] for stop in stops if "advice" in stop)
+    return {"legs": stops, "packing_list": packing}
+
+@mcp.tool()
+async def get_itinerary_advice(legs: list[ItineraryLeg], age: str = "25", style: str = "休闲") -> str:
+    """Get weather and fashion advice for every stop of a multi-city trip in one call.
+
+    ``legs`` lists the stops in order: a city, optionally a date and a time period.
+    Returns one JSON document with the get_fashion advice (or an "error") per leg
+    and a "packing_list" merging the clothing advice of all legs.
+    """
+    if len(legs) > MAX_ITINERARY_LEGS:
+        raise ValueError(f"At most {MAX_ITINERARY_LEGS} legs per itinerary")
+    async with limiter("get_itinerary_advice").admit(tool_deadline()):
+        with tracer.span("mcp.tool get_itinerary_advice", legs=len(legs)), \
+                observed("tool", "get_itinerary_advice"):
+            return codec.dumps_str(await _itinerary(legs, age, style))
+
+@app.exception_handler(limits.Overloaded)
+async def overloaded_handler(request: Request, e: limits.Overloaded):
+    # Queue full: back off and retry. Deadline passed: the caller has given up.
+    if e.reason == "queue_full":
+        return JSONResponse({"detail": f"服务繁忙，请稍后重试（{e}）"}, status_code=429,
+                            headers={"Retry-After": "1"})
+    return JSONResponse({"detail": f"请求超时（{e}）"}, status_code=504)
+
+@app.post("/fashion-advice", response_class=JSONBytesResponse)
+async def fashion_advice(request: FashionRequest, x_request_timeout_ms: float | None = Header(None)):
+    async with limiter("/fashion-advice").admit(deadline(x_request_timeout_ms)):
+        with observed("route", "/fashion-advice"):
+            try:
+                return JSONBytesResponse(await _advise(request))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+async def _advice_events(request: FashionRequest, weather_data: dict):
+    yield _sse("weather", codec.dumps_str(weather_data))
+    try:
+        with counting_input_errors():
+            for section in fashion.detailed_sections(
+                    request.city, weather_data["temperature"], request.time_period,
+                    request.age, request.style, weather_data["description"]):
+                yield _sse("section", section)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        yield _sse("error", codec.dumps_str({"detail": str(e)}))
+        raise StreamFailed from e
+    yield _sse("done", "{}")
+
+@app.post("/fashion-advice/stream")
+async def fashion_advice_stream(request: FashionRequest, x_request_timeout_ms: float | None = Header(None)):
+    """Server-sent events: "weather", then one "section" per part of the advice, then "done"."""
+    # The deadline covers the wait for a slot; the stream holds it until done
+    slots = limiter("/fashion-advice/stream")
+    await slots.acquire(deadline(x_request_timeout_ms))
+    call = observed("route", "/fashion-advice/stream")
+    try:
+        _check_time_period(request)
+        weather_data = await _weather(request.city)
+    except BaseException as e:
+        call.finish(False)
+        slots.release()
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+    return StreamingResponse(
+        _observed_stream(call, _advice_events(request, weather_data), release=slots.release),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/fashion-advice/batch")
+async def fashion_advice_batch(requests: list[FashionRequest], x_request_timeout_ms: float | None = Header(None)):
+    if len(requests) > MAX_BATCH_SIZE:
+        observed.reject("route", "/fashion-advice/batch")
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} requests per batch")
+    slots = limiter("/fashion-advice/batch")
+    await slots.acquire(deadline(x_request_timeout_ms))
+    call = observed("route", "/fashion-advice/batch")
+    return StreamingResponse(_observed_stream(call, _advise_batch(requests), release=slots.release),
+                             media_type="application/x-ndjson")
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition of the metrics above."""
+    return Response(metrics.REGISTRY.exposition(), media_type=metrics.CONTENT_TYPE)
+
+# Serve MCP from the same ASGI app so a single uvicorn event loop handles both
+# the MCP tool traffic and the REST routes: streamable HTTP at /mcp, and SSE
+# (/sse, /messages/) mounted last so the routes above take precedence.
+app.router.routes.extend(mcp.streamable_http_app().routes)
+app.mount("/", mcp.sse_app())
+
 
 if __name__ == "__main__":
     import uvicorn
-    mcp.run(transport="sse")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if args.workers > 1:
+        # The app and its tables are built once here and forked into the workers
+        import prefork
+        prefork.serve(app, args.host, args.port, args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
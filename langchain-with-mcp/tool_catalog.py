@@ -0,0 +1,239 @@
+"""Client-side MCP tool catalog over a pool of warm, self-healing sessions.
+
+``MultiServerMCPClient.get_tools`` opens a fresh session and sends ``tools/list``
+every time it is called. ``ToolCatalog`` instead keeps up to ``pool_size``
+live sessions per server (``SessionPool``), memoizes the converted LangChain
+tools for ``ttl`` seconds and drops the cached list as soon as the server
+sends ``notifications/tools/list_changed``.
+
+Each pooled session is owned by a background task that pings it every
+``health_interval`` seconds and reconnects with exponential backoff when a
+ping or a request shows the connection is gone. The session handed out by
+``ToolCatalog.session`` (and bound into the tools) is a ``PooledSession``:
+each request goes to the least busy live connection, so tools keep working
+across reconnects and many user sessions share a few connections.
+
+    catalog = ToolCatalog(CONNECTIONS, pool_size=2)   # e.g. once per service
+    tools = await catalog.get_tools("weather_fashion")
+    ...
+    await catalog.aclose()
+"""
+import asyncio
+import logging
+import random
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import anyio
+import httpx
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import types
+from mcp.shared.exceptions import McpError
+from travel_core.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+# Request errors that mean the connection itself is gone
+CONNECTION_ERRORS = (OSError, httpx.TransportError, anyio.ClosedResourceError, anyio.BrokenResourceError,
+                     anyio.EndOfStream)
+
+
+class _Connection:
+    """One pooled session plus the task that keeps it connected."""
+
+    def __init__(self):
+        self.session = None
+        self.in_flight = 0
+        self.connects = 0
+        self.broken = asyncio.Event()
+        self.task = None
+
+
+class SessionPool:
+    def __init__(self, client: MultiServerMCPClient, size: int = 1, health_interval: float = 15.0,
+                 health_timeout: float = 5.0, backoff_initial: float = 0.5, backoff_max: float = 30.0,
+                 connect_timeout: float = 30.0):
+        self.size = size
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.connect_timeout = connect_timeout
+        self._client = client
+        self._connections = {}  # server name -> [_Connection]
+        self._changed = asyncio.Condition()
+
+    def _pool(self, server_name: str):
+        connections = self._connections.get(server_name)
+        if connections is None:
+            connections = self._connections[server_name] = [_Connection() for _ in range(self.size)]
+            for index, connection in enumerate(connections):
+                connection.task = asyncio.create_task(
+                    self._keep_connected(server_name, connection), name=f"mcp-pool {server_name}[{index}]")
+        return connections
+
+    async def _keep_connected(self, server_name: str, connection: _Connection):
+        # Sessions are entered and exited in this task, as anyio requires
+        delay = self.backoff_initial
+        while True:
+            try:
+                async with AsyncExitStack() as stack:
+                    with get_tracer().span("mcp.session_setup", server=server_name, attempt=connection.connects + 1):
+                        session = await stack.enter_async_context(self._client.session(server_name))
+                    connection.session = session
+                    connection.connects += 1
+                    delay = self.backoff_initial
+                    async with self._changed:
+                        self._changed.notify_all()
+                    try:
+                        await self._watch(session, connection)
+                    finally:
+                        connection.session = None
+                        connection.broken.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                reason = e.exceptions[0] if isinstance(e, ExceptionGroup) else e
+                logger.warning("MCP session to %s failed: %r; retrying in %.1fs", server_name, reason, delay)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, self.backoff_max)
+
+    async def _watch(self, session, connection: _Connection):
+        """Return once the session looks dead: a failed ping or a broken request."""
+        while True:
+            try:
+                await asyncio.wait_for(connection.broken.wait(), self.health_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(session.send_ping(), self.health_timeout)
+            except Exception:
+                return
+
+    async def warm(self, server_name: str):
+        """Start the server's connections and wait until one is live."""
+        async with self.lease(server_name):
+            pass
+
+    @asynccontextmanager
+    async def lease(self, server_name: str):
+        """The least busy live session for ``server_name``, for one or more requests."""
+        connections = self._pool(server_name)
+        live = [c for c in connections if c.session is not None and not c.broken.is_set()]
+        if not live:
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: any(
+                        c.session is not None and not c.broken.is_set() for c in connections)), self.connect_timeout)
+                except asyncio.TimeoutError:
+                    raise ConnectionError(f"no live MCP session to {server_name} "
+                                          f"after {self.connect_timeout:g}s") from None
+            live = [c for c in connections if c.session is not None and not c.broken.is_set()]
+        connection = min(live, key=lambda c: c.in_flight)
+        connection.in_flight += 1
+        try:
+            yield connection.session
+        except McpError as e:
+            # Protocol errors leave the session usable; a closed connection does not
+            if e.error.code == types.CONNECTION_CLOSED:
+                connection.broken.set()
+            raise
+        except CONNECTION_ERRORS:
+            connection.broken.set()
+            raise
+        finally:
+            connection.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            server_name: {
+                "live": sum(c.session is not None for c in connections),
+                "connects": sum(c.connects for c in connections),
+                "in_flight": sum(c.in_flight for c in connections),
+            }
+            for server_name, connections in self._connections.items()
+        }
+
+    async def aclose(self):
+        tasks = [c.task for connections in self._connections.values() for c in connections]
+        self._connections.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class PooledSession:
+    """Stands in for a ``ClientSession``: every request leases a live pooled one."""
+
+    def __init__(self, pool: SessionPool, server_name: str):
+        self._pool = pool
+        self._server_name = server_name
+
+    def __getattr__(self, name):
+        async def request(*args, **kwargs):
+            async with self._pool.lease(self._server_name) as session:
+                return await getattr(session, name)(*args, **kwargs)
+        return request
+
+
+class ToolCatalog:
+    def __init__(self, connections: dict, ttl: float = 300.0, pool_size: int = 1, **pool_options):
+        self.ttl = ttl
+        self._client = MultiServerMCPClient({
+            name: {
+                **connection,
+                "session_kwargs": {
+                    **connection.get("session_kwargs", {}),
+                    "message_handler": self._message_handler(name),
+                },
+            }
+            for name, connection in connections.items()
+        })
+        self.pool = SessionPool(self._client, size=pool_size, **pool_options)
+        self._sessions = {name: PooledSession(self.pool, name) for name in connections}
+        self._tools = {}  # server name -> (expires_at, tools)
+        self._locks = {name: asyncio.Lock() for name in connections}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        self._tools.clear()
+        await self.pool.aclose()
+
+    def _message_handler(self, server_name: str):
+        async def handle(message):
+            if (isinstance(message, types.ServerNotification)
+                    and isinstance(message.root, types.ToolListChangedNotification)):
+                self.invalidate(server_name)
+        return handle
+
+    def invalidate(self, server_name: str):
+        """Forget the cached tool list; the next ``get_tools`` call re-lists."""
+        self._tools.pop(server_name, None)
+
+    async def session(self, server_name: str):
+        """Return the pooled session for ``server_name`` once a connection is live."""
+        await self.pool.warm(server_name)
+        return self._sessions[server_name]
+
+    async def get_tools(self, server_name: str):
+        cached = self._tools.get(server_name)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        # Concurrent callers wait for a single tools/list round-trip
+        async with self._locks[server_name]:
+            cached = self._tools.get(server_name)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            session = await self.session(server_name)
+            with get_tracer().span("mcp.list_tools", server=server_name) as span:
+                tools = await load_mcp_tools(session)
+                span.set_attribute("tools", len(tools))
+            self._tools[server_name] = (time.monotonic() + self.ttl, tools)
+            return tools
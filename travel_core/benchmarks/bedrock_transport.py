@@ -0,0 +1,67 @@
+"""Offline check of BedrockTransport limits and metrics against the Converse stub.
+
+Fires --calls concurrent converse requests from --threads threads and verifies
+that no more than --max-concurrency were ever in flight.
+
+    python benchmarks/bedrock_transport.py --calls 64 --threads 32 --max-concurrency 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from travel_core.bedrock import BedrockSettings, BedrockTransport
+from travel_core.bedrock_stub import running_stub
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # The stub does not check signatures, but botocore still needs credentials.
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "stub")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "stub")
+
+    with running_stub(latency=args.latency, throttle_rate=args.throttle_rate) as stub:
+        transport = BedrockTransport(BedrockSettings(
+            endpoint_url=stub.url,
+            max_concurrency=args.max_concurrency,
+            max_pool_connections=args.threads,
+        )).warm()
+        client = transport.client
+
+        def call(i):
+            return client.converse(
+                modelId="stub-model",
+                messages=[{"role": "user", "content": [{"text": f"request {i}"}]}],
+            )
+
+        started = time.perf_counter()
+        errors = 0
+        with ThreadPoolExecutor(args.threads) as pool:
+            for future in [pool.submit(call, i) for i in range(args.calls)]:
+                try:
+                    future.result()
+                except Exception:
+                    errors += 1
+        elapsed = time.perf_counter() - started
+
+    metrics = transport.metrics.snapshot()
+    print(json.dumps({
+        "elapsed_s": round(elapsed, 3),
+        "client_errors": errors,
+        "stub_requests": stub.requests,
+        "metrics": metrics,
+    }, indent=2))
+    assert metrics["calls"] == args.calls
+    assert metrics["max_in_flight"] <= args.max_concurrency
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Per-request CPU cost of the /fashion-advice serialization path.
+
+legacy: get_weather and get_fashion return JSON strings, the route
+json.loads both and FastAPI re-encodes the dict (jsonable_encoder, when
+FastAPI is installed, then Starlette's JSONResponse encoding).
+structured: the helpers return dicts and the route encodes once with
+travel_core.codec (orjson when installed, otherwise the stdlib encoder).
+
+    python benchmarks/codec.py --number 20000
+"""
+import argparse
+import json
+import time
+import timeit
+
+from travel_core import codec, fashion
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+WEATHER = {"location": "Paris", "temperature": "22C", "description": "阴天"}
+REQUEST = ("Paris", "晚上", "40", "优雅")
+
+
+def starlette_render(content) -> bytes:
+    """What ``starlette.responses.JSONResponse.render`` does."""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def legacy():
+    weather = json.loads(json.dumps(WEATHER, ensure_ascii=False))
+    city, period, age, style = REQUEST
+    advice = json.loads(fashion.render_detailed(
+        city, weather["temperature"], period, age, style, weather["description"]))
+    if jsonable_encoder is not None:
+        advice = jsonable_encoder(advice)
+    return starlette_render(advice)
+
+
+def structured(dumps):
+    def run():
+        weather = dict(WEATHER)
+        city, period, age, style = REQUEST
+        return dumps(fashion.detailed_advice(
+            city, weather["temperature"], period, age, style, weather["description"]))
+    return run
+
+
+_stdlib = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def cpu_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5, timer=time.process_time)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    assert json.loads(legacy()) == codec.loads(structured(codec.dumps)())
+    rows = {
+        "legacy": legacy,
+        "structured+json": structured(lambda obj: _stdlib.encode(obj).encode()),
+        f"structured+{codec.BACKEND}": structured(codec.dumps),
+    }
+    results = {name: cpu_us(fn, args.number) for name, fn in rows.items()}
+    baseline = results["legacy"]
+    print(f"codec backend: {codec.BACKEND}; jsonable_encoder: {'yes' if jsonable_encoder else 'not installed'}")
+    for name, us in results.items():
+        print(f"{name:>20}: {us:7.2f} us CPU/request  ({baseline - us:+7.2f} us saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Parity check and microbenchmark for ``travel_core.fashion``.
+
+Compares the precompiled renderers against the original per-call
+implementations of the MCP server's and the crewAI tool's ``get_fashion`` (which
+rebuilt every table and ran ``json.dumps`` on each call), checks that the
+outputs are identical, and times single and batched lookups.
+
+    python benchmarks/fashion.py --number 20000
+"""
+import argparse
+import itertools
+import json
+import timeit
+
+from travel_core import fashion
+from travel_core.fashion import STYLES, TIME_PERIODS, _basic_tables, _detailed_tables
+
+
+def legacy_detailed(location, temperature, time_period="下午", age="25", style="休闲"):
+    """The original MCP ``get_fashion`` body."""
+    base_clothing, time_specific_tips, city_specific, default_city = _detailed_tables()
+    temp_value = float(temperature.replace("C", ""))
+    temp_adjustments = {"上午": -2, "下午": 0, "晚上": -3, "凌晨": -5}
+    adjusted_temp = temp_value + temp_adjustments.get(time_period, 0)
+    try:
+        age_num = int(age)
+        if age_num < 18:
+            age_group = "teen"
+        elif age_num < 30:
+            age_group = "young"
+        elif age_num < 50:
+            age_group = "adult"
+        else:
+            age_group = "senior"
+    except ValueError:
+        age_group = "adult"
+    if adjusted_temp < 10:
+        band = base_clothing["cold"]
+    elif adjusted_temp < 20:
+        band = base_clothing["mild"]
+    else:
+        band = base_clothing["warm"]
+    response = {
+        "Location": location,
+        "Time Period": time_period,
+        "Temperature": {
+            "Actual": temperature,
+            "Feels Like": f"{adjusted_temp}C"
+        },
+        "User Profile": {
+            "Age Group": age_group,
+            "Style Preference": style
+        },
+        "Clothing Recommendations": band.get(style, band["休闲"]),
+        "Time-Specific Advice": time_specific_tips[time_period][age_group],
+        "City-Specific Advice": city_specific.get(location, default_city),
+        "天气提醒": f"当前{time_period}体感温度{adjusted_temp}度，" + (
+            "请注意保暖" if adjusted_temp < 10 else
+            "温度适中" if adjusted_temp < 20 else
+            "请注意防晒降温"
+        )
+    }
+    return json.dumps(response, ensure_ascii=False, indent=2)
+
+
+def legacy_basic(location, weather, temperature):
+    """The original crewAI ``GetFashionTool._run`` body."""
+    base_clothing, city_specific, default_city = _basic_tables()
+    temp_value = float(temperature.replace("°C", ""))
+    if temp_value < 10:
+        clothing = base_clothing["cold"]
+    elif temp_value < 20:
+        clothing = base_clothing["mild"]
+    else:
+        clothing = base_clothing["warm"]
+    response = {
+        "Location": location,
+        "Temperature": temperature,
+        "Basic Clothing Advice": clothing,
+        "City-Specific Advice": city_specific.get(location, default_city),
+        "Weather Reminder": f"Current temperature {temperature}, " + (
+            "Pay attention to keeping warm" if temp_value < 10 else
+            "Temperature is moderate" if temp_value < 20 else
+            "Pay attention to sun protection and cooling"
+        )
+    }
+    return json.dumps(response, ensure_ascii=False, indent=2)
+
+
+CITIES = ["Copenhagen", "Beijing", "Berlin", "Paris", "Phuket", "Shanghai", "Atlantis"]
+
+
+def check_parity():
+    detailed = itertools.product(
+        CITIES, ["-3C", "9C", "12.5C", "19.5C", "21C", "35C"], TIME_PERIODS,
+        ["10", "17", "18", "29", "30", "49", "50", "unknown"], list(STYLES) + ["朋克"])
+    count = 0
+    for args in detailed:
+        expected = legacy_detailed(*args)
+        assert fashion.render_detailed(*args) == expected, f"detailed mismatch for {args}"
+        # The streamed sections add up to the same document, in the same key order
+        merged = {}
+        for chunk in fashion.detailed_sections(*args):
+            merged.update(json.loads(chunk))
+        assert list(merged.items()) == list(json.loads(expected).items()), f"section mismatch for {args}"
+        assert json.dumps(fashion.detailed_advice(*args), ensure_ascii=False, indent=2) == expected, \
+            f"advice mismatch for {args}"
+        count += 1
+    for args in itertools.product(CITIES, ["Sunny"], ["-3", "9.5", "10", "19", "20", "32°C"]):
+        assert fashion.render_basic(*args) == legacy_basic(*args), f"basic mismatch for {args}"
+        count += 1
+
+    # recommend_many agrees with the scalar helpers
+    temps = ["3C", "12C", "18C", "25C", "32C"] * 4
+    periods = list(TIME_PERIODS) * 5
+    recs = fashion.recommend_many(temps, periods, "40", "商务", "Paris")
+    for rec, temp, period in zip(recs, temps, periods):
+        adjusted = fashion.feels_like(fashion.parse_temperature(temp), period)
+        assert rec == (adjusted, fashion.temperature_band(adjusted), "adult", "商务", period, "Paris")
+
+    # An unknown time period is a readable ValueError before anything is rendered
+    for render in (fashion.render_detailed, fashion.detailed_advice, lambda *a: next(fashion.detailed_sections(*a))):
+        try:
+            render("Paris", "22C", "中午")
+        except fashion.UnknownTimePeriod as e:
+            assert isinstance(e, ValueError) and "中午" in str(e)
+        else:
+            raise AssertionError(f"{render} accepted an unknown time period")
+    return count
+
+
+def per_call_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"parity: {check_parity()} cases identical")
+
+    detailed = ("Paris", "22C", "晚上", "40", "优雅")
+    basic = ("Paris", "Cloudy", "22")
+    rows = [
+        ("detailed legacy", lambda: legacy_detailed(*detailed)),
+        ("detailed render", lambda: fashion.render_detailed(*detailed)),
+        ("detailed stream", lambda: list(fashion.detailed_sections(*detailed))),
+        ("basic legacy", lambda: legacy_basic(*basic)),
+        ("basic render", lambda: fashion.render_basic(*basic)),
+    ]
+    for name, fn in rows:
+        print(f"{name:>16}: {per_call_us(fn, args.number):8.2f} us/call")
+
+    temps = [f"{t % 40}C" for t in range(args.batch)]
+    periods = [TIME_PERIODS[i % 4] for i in range(args.batch)]
+    ages = [str(10 + i % 70) for i in range(args.batch)]
+    scalar = per_call_us(lambda: [
+        (fashion.temperature_band(fashion.feels_like(fashion.parse_temperature(t), p)), fashion.age_group(a))
+        for t, p, a in zip(temps, periods, ages)], 20) / args.batch
+    batched = per_call_us(lambda: fashion.recommend_many(temps, periods, ages), 20) / args.batch
+    print(f"{'scalar classify':>16}: {scalar:8.3f} us/item")
+    print(f"{'recommend_many':>16}: {batched:8.3f} us/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Overload check and admission overhead for ``travel_core.limits``.
+
+Holds every slot of a ConcurrencyLimiter, lets a wave of waiters time out in
+the queue and checks that they all leave it: ``queued`` drops back to 0 and a
+caller with a generous deadline is queued and served instead of being turned
+away with ``queue_full``. It then times an uncontended ``admit``.
+
+    python benchmarks/limits.py --limit 4 --max-queue 8
+"""
+import argparse
+import asyncio
+import time
+import timeit
+
+from travel_core.limits import ConcurrencyLimiter, Overloaded
+
+
+async def check_timeouts_leave_queue(limit, max_queue):
+    limiter = ConcurrencyLimiter("check", limit=limit, max_queue=max_queue)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.admit():
+            await release.wait()
+
+    holders = [asyncio.ensure_future(hold()) for _ in range(limit)]
+    await asyncio.sleep(0)
+    assert limiter.active == limit
+
+    async def impatient():
+        try:
+            await limiter.acquire(time.monotonic() + 0.01)
+        except Overloaded as e:
+            return e.reason
+        return "admitted"
+
+    # Two full queues' worth, in two waves that each fill the queue and time out
+    reasons = []
+    for _ in range(2):
+        reasons += await asyncio.gather(*(impatient() for _ in range(max_queue)))
+    assert reasons == ["deadline_exceeded"] * (2 * max_queue), reasons
+    assert limiter.queued == 0, f"{limiter.queued} timed-out waiters are still queued"
+
+    # Cancelled waiters leave the queue too
+    cancelled = [asyncio.ensure_future(limiter.acquire()) for _ in range(max_queue)]
+    await asyncio.sleep(0)
+    for task in cancelled:
+        task.cancel()
+    await asyncio.gather(*cancelled, return_exceptions=True)
+    assert limiter.queued == 0, f"{limiter.queued} cancelled waiters are still queued"
+
+    async def patient():
+        async with limiter.admit(time.monotonic() + 5):
+            return "served"
+
+    late = asyncio.ensure_future(patient())
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+    release.set()
+    assert await late == "served"
+    await asyncio.gather(*holders)
+    assert (limiter.active, limiter.queued) == (0, 0)
+    return dict(limiter.rejected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=8)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    rejected = asyncio.run(check_timeouts_leave_queue(args.limit, args.max_queue))
+    print(f"overload: timed-out and cancelled waiters left the queue; rejections {rejected}")
+
+    limiter = ConcurrencyLimiter("bench", limit=args.limit, max_queue=args.max_queue)
+
+    async def admit_many():
+        for _ in range(args.number):
+            async with limiter.admit(time.monotonic() + 60):
+                pass
+
+    seconds = min(timeit.repeat(lambda: asyncio.run(admit_many()), number=1, repeat=5))
+    print(f"uncontended admit: {seconds / args.number * 1e6:.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
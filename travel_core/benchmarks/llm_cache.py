@@ -0,0 +1,113 @@
+"""Exercise ResponseCache against a slow fake model.
+
+Replays a stream of agent prompts (repeats differ only in whitespace) through
+the cache and reports model calls, hit rate and wall-clock time against the
+uncached run. It then checks TTL expiry and size eviction with a fake clock.
+If langchain-core is installed, it also checks the langchain adapter with a
+fake chat model.
+
+    python benchmarks/llm_cache.py --latency 0.05 --prompts 60
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from travel_core.llm_cache import ResponseCache, langchain_cache, make_key
+
+CITIES = ["Copenhagen", "Beijing", "Berlin", "Paris", "Phuket", "Shanghai"]
+MODEL = "us.amazon.nova-lite-v1:0"
+TOOLS = [{"name": "get_weather", "parameters": {"location": {"type": "string"}}}]
+
+
+class FakeModel:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        return f"Weather report for: {prompt[-20:]}"
+
+
+def prompts(count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        city = rng.choice(CITIES)
+        spacing = rng.choice([" ", "  ", "\n"])
+        yield f"Use the get_weather tool to get weather{spacing}information for {city}"
+
+
+def replay(model, cache, count, seed):
+    started = time.perf_counter()
+    for prompt in prompts(count, seed):
+        if cache is None:
+            model(prompt)
+        else:
+            cache.get_or_call(make_key(MODEL, prompt, TOOLS), lambda: model(prompt))
+    return round(time.perf_counter() - started, 3)
+
+
+def check_expiry_and_eviction(path):
+    now = [0.0]
+    cache = ResponseCache(path, ttl=10, max_bytes=100, clock=lambda: now[0])
+    cache.put("a", "x" * 40)
+    now[0] = 1
+    cache.put("b", "y" * 40)
+    now[0] = 2
+    assert cache.get("a") == "x" * 40  # "a" is now the most recently used
+    cache.put("c", "z" * 40)  # 120 bytes > 100: evicts "b"
+    assert cache.get("b") is None and cache.stats()["evictions"] == 1
+    now[0] = 20
+    assert cache.get("a") is None and cache.stats()["expired"] == 1
+    cache.close()
+
+
+def check_langchain_adapter(path):
+    try:
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    except ImportError:
+        return "skipped (langchain-core not installed)"
+    cache = ResponseCache(path)
+    model = FakeListChatModel(responses=["first", "second"], cache=langchain_cache(cache))
+    answers = [model.invoke("What to wear in Paris?").content, model.invoke("What to wear in  Paris?").content]
+    assert answers == ["first", "first"], answers
+    assert cache.stats()["hits"] == 1
+    cache.close()
+    return "ok"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake model call")
+    parser.add_argument("--prompts", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uncached_model = FakeModel(args.latency)
+        uncached_s = replay(uncached_model, None, args.prompts, args.seed)
+
+        cache = ResponseCache(os.path.join(tmp, "replay.sqlite"))
+        cached_model = FakeModel(args.latency)
+        cached_s = replay(cached_model, cache, args.prompts, args.seed)
+        stats = cache.stats()
+        cache.close()
+        assert cached_model.calls == len(CITIES) == stats["misses"], "whitespace variants should share one entry"
+
+        check_expiry_and_eviction(os.path.join(tmp, "eviction.sqlite"))
+        adapter = check_langchain_adapter(os.path.join(tmp, "langchain.sqlite"))
+
+    print(json.dumps({
+        "uncached": {"model_calls": uncached_model.calls, "elapsed_s": uncached_s},
+        "cached": {"model_calls": cached_model.calls, "elapsed_s": cached_s, **stats},
+        "ttl_and_eviction": "ok",
+        "langchain_adapter": adapter,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Overhead of travel_core.metrics instrumentation.
+
+Times one server.py-style instrumented call (in-flight gauge up/down, one
+latency histogram observation, one labelled counter increment) around a
+representative handler body (fashion.detailed_advice). It also compares
+recording cost against a lock-per-update implementation and, if installed,
+prometheus_client. The comparison runs single-threaded and with --threads
+writers. Timings on a shared machine vary from run to run, so every figure is
+the median of --runs runs, with the fastest and slowest run next to it.
+
+    python benchmarks/metrics.py --number 200000 --threads 8 --runs 7
+"""
+import argparse
+import statistics
+import threading
+import time
+import timeit
+from bisect import bisect_left
+
+from travel_core import fashion, metrics
+
+registry = metrics.Registry()
+REQUESTS = metrics.Counter("bench_requests_total", "Requests", ["kind", "name", "outcome"], registry=registry)
+LATENCY = metrics.Histogram("bench_request_duration_seconds", "Latency", ["kind", "name"], registry=registry)
+IN_FLIGHT = metrics.Gauge("bench_requests_in_flight", "In flight", ["kind", "name"], registry=registry)
+
+
+def handler():
+    return fashion.detailed_advice("Paris", "22C", "晚上", "40", "优雅", "阴天")
+
+
+# Children resolved once per tool, as server.observed does
+SERIES = (IN_FLIGHT.labels("tool", "get_fashion"), LATENCY.labels("tool", "get_fashion"),
+          REQUESTS.labels("tool", "get_fashion", "ok"))
+
+
+def instrumented():
+    in_flight, latency, ok_count = SERIES
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        return handler()
+    finally:
+        in_flight.dec()
+        latency.observe(time.perf_counter() - started)
+        ok_count.inc()
+
+
+class LockedRecorder:
+    """Reference implementation: one shared value per metric, updated under a lock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.buckets = [0] * (len(metrics.DEFAULT_BUCKETS) + 1)
+        self.total = 0.0
+
+    def record(self, value):
+        with self.lock:
+            self.in_flight += 1
+        with self.lock:
+            self.in_flight -= 1
+            self.buckets[bisect_left(metrics.DEFAULT_BUCKETS, value)] += 1
+            self.total += value
+            self.requests += 1
+
+
+def lock_free_record(value):
+    in_flight, latency, ok_count = SERIES
+    in_flight.inc()
+    in_flight.dec()
+    latency.observe(value)
+    ok_count.inc()
+
+
+def prometheus_client_recorder():
+    try:
+        import prometheus_client
+    except ImportError:
+        return None
+    registry = prometheus_client.CollectorRegistry()
+    requests = prometheus_client.Counter("pc_requests", "Requests", ["name"], registry=registry)
+    latency = prometheus_client.Histogram("pc_latency_seconds", "Latency", ["name"], registry=registry,
+                                          buckets=metrics.DEFAULT_BUCKETS)
+    in_flight = prometheus_client.Gauge("pc_in_flight", "In flight", ["name"], registry=registry)
+
+    gauge, histogram, counter = (in_flight.labels("get_fashion"), latency.labels("get_fashion"),
+                                 requests.labels("get_fashion"))
+
+    def record(value):
+        gauge.inc()
+        gauge.dec()
+        histogram.observe(value)
+        counter.inc()
+    return record
+
+
+def per_call_ns(fn, number, runs):
+    """ns per call of ``fn``, one value per run."""
+    return [seconds / number * 1e9 for seconds in timeit.repeat(fn, number=number, repeat=runs)]
+
+
+def threaded_ns(record, threads, number):
+    """Wall-clock ns per record() with ``threads`` writers."""
+    def work():
+        for _ in range(number):
+            record(0.003)
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - started) / (threads * number) * 1e9
+
+
+def spread(values):
+    """"median (min-max)" of per-run ns figures."""
+    return f"{statistics.median(values):6.0f} ({min(values):.0f}-{max(values):.0f})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    bare = per_call_ns(handler, args.number, args.runs)
+    wrapped = per_call_ns(instrumented, args.number, args.runs)
+    overhead = statistics.median(wrapped) - statistics.median(bare)
+    print(f"median ns/call over {args.runs} runs (fastest-slowest run)")
+    print(f"handler alone:         {spread(bare)}")
+    print(f"handler instrumented:  {spread(wrapped)}  (+{overhead:.0f} ns, "
+          f"{overhead / statistics.median(bare):.0%})")
+
+    recorders = {"lock-free (travel_core)": lock_free_record, "locked": LockedRecorder().record}
+    pc = prometheus_client_recorder()
+    if pc:
+        recorders["prometheus_client"] = pc
+    print(f"\nrecording cost per call (1 thread / {args.threads} threads):")
+    for name, record in recorders.items():
+        single = per_call_ns(lambda: record(0.003), args.number, args.runs)
+        contended = [threaded_ns(record, args.threads, args.number // args.threads) for _ in range(args.runs)]
+        print(f"  {name:<24} {spread(single)}   {spread(contended)}")
+
+    assert 'bench_requests_total{kind="tool",name="get_fashion",outcome="ok"}' in registry.exposition()
+
+
+if __name__ == "__main__":
+    main()
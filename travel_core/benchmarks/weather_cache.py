@@ -0,0 +1,82 @@
+"""Benchmark CachedWeatherProvider against a slow fake upstream.
+
+Runs --clients concurrent clients issuing lookups with a skewed city mix for
+--duration seconds, once uncached and once through the cache, and reports hit
+rate, upstream fetches and p50/p95/p99 latency.
+
+    python benchmarks/weather_cache.py --latency 0.05 --ttl 1 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from travel_core.weather import CachedWeatherProvider, FakeWeatherProvider
+
+CITIES = {
+    "Copenhagen": (18, "Partly cloudy"),
+    "Beijing": (25, "Sunny"),
+    "Berlin": (20, "Clear sky"),
+    "Paris": (22, "Cloudy"),
+    "Phuket": (32, "Tropical"),
+    "Shanghai": (28, "Humid"),
+}
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def drive(provider, clients, duration, think_time):
+    names = list(CITIES)
+    weights = [1 / (rank + 1) for rank in range(len(names))]  # Zipf-like popularity
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        while time.perf_counter() < deadline:
+            city = random.choices(names, weights)[0]
+            started = time.perf_counter()
+            await provider.fetch(city)
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(think_time)
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+
+async def run(args):
+    upstream = FakeWeatherProvider(CITIES, latency=args.latency, jitter=args.jitter)
+    uncached = await drive(upstream, args.clients, args.duration, args.think_time)
+    uncached["upstream_fetches"] = upstream.fetches
+
+    upstream = FakeWeatherProvider(CITIES, latency=args.latency, jitter=args.jitter)
+    cache = CachedWeatherProvider(upstream, ttl=args.ttl, stale_ttl=args.stale_ttl)
+    cached = await drive(cache, args.clients, args.duration, args.think_time)
+    cached.update(cache.stats())
+    return {"uncached": uncached, "cached": cached}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="upstream latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="extra random upstream latency (s)")
+    parser.add_argument("--ttl", type=float, default=1.0)
+    parser.add_argument("--stale-ttl", type=float, default=30.0)
+    parser.add_argument("--think-time", type=float, default=0.001)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Runtime helpers shared by the crewAI and langchain-with-mcp demos."""
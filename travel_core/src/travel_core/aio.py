@@ -0,0 +1,72 @@
+"""A process-wide background event loop for calling async code from sync code.
+
+Sync entry points (e.g. crewAI ``BaseTool._run``, which runs on worker threads)
+submit coroutines to one long-lived loop instead of spinning up a new loop per
+call with ``asyncio.run``. Loop-bound state such as in-flight fetches and
+background revalidation tasks therefore survives between calls. Async entry
+points (``BaseTool._arun``) running on some other loop hop onto the shared
+one with ``on_shared_loop``. CPU-bound parts go to a small bounded thread
+pool (``run_in_pool``) so they never stall either loop.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads for CPU-bound tool work; kept small because of the GIL
+CPU_WORKERS = int(os.getenv("TRAVEL_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_loop = None
+_pool = None
+_lock = threading.Lock()
+
+
+def shared_loop() -> asyncio.AbstractEventLoop:
+    """The shared loop, started on a daemon thread on first use."""
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="travel-core-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro, timeout: float | None = None):
+    """Run ``coro`` on the shared loop and block until it finishes.
+
+    Must not be called from the shared loop itself.
+    """
+    loop = shared_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the shared loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+async def on_shared_loop(coro):
+    """Await ``coro`` on the shared loop, from the shared loop or any other."""
+    loop = shared_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def cpu_pool() -> ThreadPoolExecutor:
+    """The bounded pool behind ``run_in_pool``, created on first use."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="travel-core-cpu")
+    return _pool
+
+
+async def run_in_pool(fn, *args):
+    """Run the blocking ``fn(*args)`` on the bounded CPU pool."""
+    return await asyncio.get_running_loop().run_in_executor(cpu_pool(), fn, *args)
@@ -0,0 +1,193 @@
+"""Shared Bedrock runtime transport.
+
+One process-wide boto3 ``bedrock-runtime`` client with a sized connection pool,
+TCP keep-alive, adaptive retries and explicit timeouts, plus a semaphore that
+caps the number of model calls in flight. Both the langchain client
+(``ChatBedrockConverse(client=get_transport().client)``) and the crewAI ``LLM``
+go through it, so their calls share one limit and one set of metrics.
+
+Every knob can be set from the environment (see ``BedrockSettings.from_env``),
+including ``BEDROCK_ENDPOINT_URL`` to point at ``travel_core.bedrock_stub``.
+"""
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+
+from travel_core.tracing import get_tracer
+
+
+@dataclass(frozen=True)
+class BedrockSettings:
+    region_name: str | None = None
+    max_pool_connections: int = 50
+    max_concurrency: int = 8
+    max_attempts: int = 5
+    retry_mode: str = "adaptive"
+    connect_timeout: float = 5.0
+    read_timeout: float = 120.0
+    endpoint_url: str | None = None
+
+    @classmethod
+    def from_env(cls, **overrides):
+        env = os.environ
+        return replace(cls(
+            region_name=(env.get("AWS_REGION") or env.get("AWS_REGION_NAME")
+                         or env.get("AWS_DEFAULT_REGION") or cls.region_name),
+            max_pool_connections=int(env.get("BEDROCK_MAX_POOL_CONNECTIONS", cls.max_pool_connections)),
+            max_concurrency=int(env.get("BEDROCK_MAX_CONCURRENCY", cls.max_concurrency)),
+            max_attempts=int(env.get("BEDROCK_MAX_ATTEMPTS", cls.max_attempts)),
+            retry_mode=env.get("BEDROCK_RETRY_MODE", cls.retry_mode),
+            connect_timeout=float(env.get("BEDROCK_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(env.get("BEDROCK_READ_TIMEOUT", cls.read_timeout)),
+            endpoint_url=env.get("BEDROCK_ENDPOINT_URL") or None,
+        ), **overrides)
+
+
+class BedrockMetrics:
+    """Counters for model calls made through a transport."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.wait_seconds = 0.0
+        self.call_seconds = 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "avg_wait_ms": round(self.wait_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+                "avg_call_ms": round(self.call_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+            }
+
+
+def _is_throttle(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code", "")
+    return code in ("ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException")
+
+
+class BedrockTransport:
+    # boto3 operations that run a model and therefore count against the limit
+    MODEL_OPERATIONS = frozenset({
+        "converse", "converse_stream", "invoke_model", "invoke_model_with_response_stream",
+    })
+
+    def __init__(self, settings: BedrockSettings | None = None):
+        self.settings = settings or BedrockSettings.from_env()
+        self.metrics = BedrockMetrics()
+        self._slots = threading.BoundedSemaphore(self.settings.max_concurrency)
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def raw_client(self):
+        """The underlying boto3 client, created on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @property
+    def client(self):
+        """A boto3 client whose model operations are gated by ``slot()``."""
+        return _GatedClient(self, self.raw_client)
+
+    def _create_client(self):
+        import boto3
+        from botocore.config import Config
+
+        settings = self.settings
+        # No region configured: whatever boto3 resolves (profile, instance metadata), else us-west-2
+        region_name = settings.region_name or boto3.session.Session().region_name or "us-west-2"
+        config = Config(
+            region_name=region_name,
+            max_pool_connections=settings.max_pool_connections,
+            retries={"max_attempts": settings.max_attempts, "mode": settings.retry_mode},
+            connect_timeout=settings.connect_timeout,
+            read_timeout=settings.read_timeout,
+            tcp_keepalive=True,
+        )
+        return boto3.client("bedrock-runtime", config=config, endpoint_url=settings.endpoint_url)
+
+    def warm(self):
+        """Build the client up front so the first request does not pay for it."""
+        self.raw_client
+        return self
+
+    @contextmanager
+    def slot(self):
+        """Hold one of ``max_concurrency`` model-call slots and record metrics."""
+        metrics = self.metrics
+        queued = time.perf_counter()
+        with self._slots:
+            started = time.perf_counter()
+            with metrics._lock:
+                metrics.in_flight += 1
+                metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+            try:
+                yield
+            except Exception as e:
+                with metrics._lock:
+                    metrics.errors += 1
+                    metrics.throttled += _is_throttle(e)
+                raise
+            finally:
+                finished = time.perf_counter()
+                with metrics._lock:
+                    metrics.in_flight -= 1
+                    metrics.calls += 1
+                    metrics.wait_seconds += started - queued
+                    metrics.call_seconds += finished - started
+
+    def call(self, operation, *args, **kwargs):
+        with get_tracer().span(
+            f"bedrock.{getattr(operation, '__name__', 'call')}",
+            kind="client",
+            **{"gen_ai.system": "aws.bedrock", "gen_ai.request.model": kwargs.get("modelId", "")},
+        ) as span:
+            with self.slot():
+                response = operation(*args, **kwargs)
+            usage = response.get("usage") if isinstance(response, dict) else None
+            if usage:
+                span.add_tokens(usage.get("inputTokens", 0), usage.get("outputTokens", 0))
+            return response
+
+
+class _GatedClient:
+    """Proxy for a boto3 client that routes model operations through the transport."""
+
+    def __init__(self, transport: BedrockTransport, client):
+        self._transport = transport
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name in BedrockTransport.MODEL_OPERATIONS:
+            return functools.partial(self._transport.call, attr)
+        return attr
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> BedrockTransport:
+    """The process-wide transport, configured from the environment."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = BedrockTransport()
+    return _transport
@@ -0,0 +1,108 @@
+"""Local stub of the Bedrock runtime Converse API, for offline checks.
+
+Answers ``POST /model/{modelId}/converse`` with a canned assistant message (or
+``reply(request)`` when ``reply`` is callable) after an optional delay, keeps
+every request body in ``transcript``, and can throttle a fraction of requests with the same 429
+``ThrottlingException`` Bedrock returns. Point a client at it with
+``BEDROCK_ENDPOINT_URL=http://127.0.0.1:8765`` and any dummy AWS credentials.
+
+    python -m travel_core.bedrock_stub --port 8765 --latency 0.2
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ConverseStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, throttle_rate=0.0, reply="stub reply"):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.reply = reply
+        self.requests = 0
+        self.transcript = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with server._lock:
+            server.requests += 1
+            server.transcript.append(request)
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 3 or parts[0] != "model" or parts[2] != "converse":
+            self._send(404, {"message": f"Unknown operation {self.path}"},
+                       [("x-amzn-ErrorType", "ResourceNotFoundException")])
+            return
+        if random.random() < server.throttle_rate:
+            self._send(429, {"message": "Too many requests"}, [("x-amzn-ErrorType", "ThrottlingException")])
+            return
+
+        started = time.perf_counter()
+        time.sleep(server.latency)
+        reply = server.reply(request) if callable(server.reply) else server.reply
+        input_tokens = sum(len(json.dumps(m)) // 4 for m in request.get("messages", []))
+        output_tokens = len(reply) // 4 + 1
+        self._send(200, {
+            "output": {"message": {"role": "assistant", "content": [{"text": reply}]}},
+            "stopReason": "end_turn",
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                      "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": int((time.perf_counter() - started) * 1000)},
+        })
+
+
+@contextmanager
+def running_stub(port=0, **options):
+    """Run a ``ConverseStub`` on a background thread for the duration of the block."""
+    server = ConverseStub(("127.0.0.1", port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Bedrock Converse API stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = ConverseStub(("127.0.0.1", args.port), latency=args.latency, throttle_rate=args.throttle_rate)
+    print(f"Converse stub listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
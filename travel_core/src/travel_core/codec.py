@@ -0,0 +1,35 @@
+"""JSON encoding for the wire boundaries (MCP tool results, HTTP bodies).
+
+Internal functions pass plain dicts and lists around and serialize exactly
+once, here. ``orjson`` is used when it is installed (``pip install
+"travel-core[fast]"``); otherwise the stdlib encoder produces equivalent JSON.
+Non-ASCII text is emitted as UTF-8 either way.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    def dumps(obj) -> bytes:
+        """Serialize ``obj`` to compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj)
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj) -> bytes:
+        """Serialize ``obj`` to compact UTF-8 JSON bytes."""
+        return _encoder.encode(obj).encode()
+
+    loads = json.loads
+
+
+def dumps_str(obj) -> str:
+    """``dumps`` as text, for APIs that want ``str`` (e.g. MCP tool results)."""
+    return dumps(obj).decode()
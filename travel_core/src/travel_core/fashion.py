@@ -0,0 +1,659 @@
+"""Fashion recommendation core shared by the MCP server and the crewAI tools.
+
+Both front ends answer with the same temperature-band/city lookups in two
+flavours:
+
+- ``render_detailed``: the MCP server's ``get_fashion`` document (Chinese,
+  per style, time period and age group);
+- ``render_basic``: the crewAI ``get_fashion`` document (English, per band and
+  city).
+
+The tables are built once at import time, frozen, and indexed by section
+(clothing by band and style, tips by time period and age group, advice by
+city). Every entry is also kept pre-serialized, so a render only joins a
+handful of cached chunks instead of rebuilding and re-encoding the whole
+document. ``detailed_sections`` yields the same document section by section
+for streaming responses and ``detailed_advice`` returns it as a dict.
+
+``recommend`` classifies one request (feels-like temperature, band, age
+group); ``recommend_many`` classifies whole arrays in one pass, and
+``detailed_advice_for`` turns either result into the document, which is how
+the batch and itinerary tools answer many requests at once.
+"""
+import json
+from bisect import bisect_right
+from json.encoder import encode_basestring
+from types import MappingProxyType
+from typing import NamedTuple
+
+TIME_PERIODS = ("上午", "下午", "晚上", "凌晨")
+STYLES = ("休闲", "商务", "优雅", "运动")
+AGE_GROUPS = ("teen", "young", "adult", "senior")
+TEMPERATURE_BANDS = ("cold", "mild", "warm")
+# Upper bounds (exclusive, degrees Celsius) of the "cold" and "mild" bands
+BAND_THRESHOLDS = (10, 20)
+DEFAULT_STYLE = "休闲"
+
+# Adjust temperature perception based on time period
+TEMP_ADJUSTMENTS = MappingProxyType({
+    "上午": -2,  # 早上感觉较凉
+    "下午": 0,   # 基准温度
+    "晚上": -3,  # 晚上较凉
+    "凌晨": -5   # 最冷
+})
+
+DETAILED_REMINDERS = MappingProxyType({
+    "cold": "请注意保暖",
+    "mild": "温度适中",
+    "warm": "请注意防晒降温",
+})
+
+
+BASIC_REMINDERS = MappingProxyType({
+    "cold": "Pay attention to keeping warm",
+    "mild": "Temperature is moderate",
+    "warm": "Pay attention to sun protection and cooling",
+})
+
+
+def _detailed_tables():
+    """Build the MCP server's recommendation tables as plain dict literals.
+
+    Returns ``(base_clothing, time_specific_tips, city_specific, default_city)``
+    where ``base_clothing`` is keyed by temperature band and then style.
+    """
+    base_clothing = {
+        "cold": {
+            "休闲": {
+                "外套": "保暖羽绒服或休闲羊毛大衣",
+                "上装": "厚毛衣或连帽衫",
+                "下装": "保暖牛仔裤或保暖裤",
+                "配饰": "毛线帽和保暖围巾",
+                "鞋子": "保暖运动鞋或靴子"
+            },
+            "商务": {
+                "外套": "羊毛大衣或风衣",
+                "上装": "西装搭配保暖内衣",
+                "下装": "羊毛西裤",
+                "配饰": "皮手套和羊绒围巾",
+                "鞋子": "皮靴或皮鞋"
+            },
+            "优雅": {
+                "外套": "长款羊绒大衣",
+                "上装": "高领毛衣搭配西装外套",
+                "下装": "羊毛西裤或长裙",
+                "配饰": "设计师围巾和皮手套",
+                "鞋子": "高跟靴或正装鞋"
+            },
+            "运动": {
+                "外套": "保暖运动夹克",
+                "上装": "保暖内衣搭配抓绒衣",
+                "下装": "保暖运动裤",
+                "配饰": "运动帽和保暖围脖",
+                "鞋子": "保暖跑鞋"
+            }
+        },
+        "mild": {
+            "休闲": {
+                "外套": "轻薄牛仔夹克或连帽衫",
+                "上装": "长袖T恤或轻薄毛衣",
+                "下装": "牛仔裤或休闲裤",
+                "配饰": "轻薄围巾或帽子",
+                "鞋子": "运动鞋或休闲鞋"
+            },
+            "商务": {
+                "外套": "轻薄西装外套",
+                "上装": "衬衫或女式衬衫",
+                "下装": "西裤或铅笔裙",
+                "配饰": "轻薄围巾或口袋方巾",
+                "鞋子": "正装鞋或乐福鞋"
+            },
+            "优雅": {
+                "外套": "轻薄风衣或设计师夹克",
+                "上装": "丝质衬衫或精致针织衫",
+                "下装": "修身裤或中长裙",
+                "配饰": "丝巾或精致首饰",
+                "鞋子": "高跟鞋或设计师平底鞋"
+            },
+            "运动": {
+                "外套": "轻薄运动夹克或防风衣",
+                "上装": "速干长袖",
+                "下装": "运动裤或短裤",
+                "配饰": "运动帽或头带",
+                "鞋子": "跑鞋或训练鞋"
+            }
+        },
+        "warm": {
+            "休闲": {
+                "外套": "可选轻薄夹克",
+                "上装": "T恤或短袖衬衫",
+                "下装": "短裤或轻薄长裤",
+                "配饰": "太阳镜和帽子",
+                "鞋子": "轻便运动鞋或凉鞋"
+            },
+            "商务": {
+                "外套": "轻薄西装外套（可选）",
+                "上装": "短袖衬衫或女式衬衫",
+                "下装": "轻薄西裤或裙子",
+                "配饰": "口袋方巾或轻薄围巾",
+                "鞋子": "透气正装鞋"
+            },
+            "优雅": {
+                "外套": "轻薄开衫或披肩",
+                "上装": "无袖衬衫或轻薄丝质上衣",
+                "下装": "轻薄面料长裤或夏季连衣裙",
+                "配饰": "精致首饰或丝巾",
+                "鞋子": "露趾高跟鞋或优雅凉鞋"
+            },
+            "运动": {
+                "外套": "超轻运动夹克",
+                "上装": "速干背心或T恤",
+                "下装": "运动短裤或裙裤",
+                "配饰": "遮阳帽和运动头带",
+                "鞋子": "透气跑鞋"
+            }
+        },
+    }
+
+    # Time-specific adjustments
+    time_specific_tips = {
+        "上午": {
+            "teen": "早上较凉，注意分层穿搭。别忘了带上学校/活动用的包！",
+            "young": "选择可以随着天气变暖逐层脱下的衣物。",
+            "adult": "专业的早晨着装，注意温度变化时的分层。",
+            "senior": "容易脱换的保暖层次，搭配舒适的步行鞋。"
+        },
+        "下午": {
+            "teen": "适合活动和社交的舒适时尚装扮。",
+            "young": "适合工作/休闲活动的平衡搭配。",
+            "adult": "适合会议/活动的专业舒适着装。",
+            "senior": "轻薄透气的衣物，注意防晒。"
+        },
+        "晚上": {
+            "teen": "和朋友晚上活动时添加一件轻薄外套。",
+            "young": "适合晚间社交活动或晚餐的时尚装扮。",
+            "adult": "适合晚餐或活动的优雅晚装。",
+            "senior": "保暖舒适的晚间装扮，注意保温。"
+        },
+        "凌晨": {
+            "teen": "夜间外出时注意保暖和可见度。",
+            "young": "夜间活动时既时尚又保暖的装扮。",
+            "adult": "夜间活动的优雅保暖着装。",
+            "senior": "夜间额外的保暖层次，注重舒适。"
+        }
+    }
+
+    # City-specific advice with time period considerations
+    city_specific = {
+        "Copenhagen": {
+            "城市特点": "北欧时尚之都，极简主义风格",
+            "穿衣风格": "简约优雅，主要以黑、白、灰为主",
+            "文化建议": "保守着装，注重环保意识",
+            "特别提示": {
+                "上午": "清晨较凉，尤其靠近水域时注意保暖",
+                "下午": "大多数场合适合商务休闲装",
+                "晚上": "晚间活动添加时尚外层",
+                "凌晨": "保暖层次和反光细节注意安全"
+            },
+            "适合场所": "设计博物馆、新港、小美人鱼雕像",
+            "禁忌": "避免过于花哨的装扮"
+        },
+        "Beijing": {
+            "城市特点": "现代与传统并存的国际大都市",
+            "穿衣风格": "优雅实用",
+            "文化建议": "参观景点时着装正式",
+            "特别提示": {
+                "上午": "注意分层穿搭和空气质量",
+                "下午": "建议防晒和戴口罩",
+                "晚上": "餐饮娱乐场所适合商务休闲装",
+                "凌晨": "夜间较凉注意保暖"
+            },
+            "适合场所": "故宫、长城、胡同",
+            "禁忌": "参观寺庙时避免暴露着装"
+        },
+        "Berlin": {
+            "城市特点": "前卫艺术与历史文化的融合",
+            "穿衣风格": "个性化，街头风格流行",
+            "文化建议": "着装可以大胆创新",
+            "特别提示": {
+                "上午": "清晨较凉注意保暖",
+                "下午": "街头风格适合大多数场合",
+                "晚上": "创意前卫的晚装",
+                "凌晨": "夜店跳舞注意保暖"
+            },
+            "适合场所": "博物馆岛、勃兰登堡门、东边画廊",
+            "禁忌": "参观纪念馆时避免不当着装"
+        },
+        "Paris": {
+            "城市特点": "全球时尚之都",
+            "穿衣风格": "优雅时尚，注重细节",
+            "文化建议": "偏向正式优雅",
+            "特别提示": {
+                "上午": "早晨咖啡馆适合时尚休闲装",
+                "下午": "购物时间优雅日装",
+                "晚上": "晚餐和活动需要盛装",
+                "凌晨": "精致的夜间着装"
+            },
+            "适合场所": "埃菲尔铁塔、卢浮宫、香榭丽舍大街",
+            "禁忌": "正式场合避免运动装"
+        },
+        "Phuket": {
+            "城市特点": "热带岛屿度假胜地",
+            "穿衣风格": "轻便凉爽，度假风格",
+            "文化建议": "注意泰国文化礼仪",
+            "特别提示": {
+                "上午": "活动时穿着轻便透气",
+                "下午": "防晒必不可少",
+                "晚上": "晚餐时间商务休闲装",
+                "凌晨": "晚风轻薄层次"
+            },
+            "适合场所": "海滩、寺庙、夜市",
+            "禁忌": "参观寺庙时着装得体"
+        },
+        "Shanghai": {
+            "城市特点": "现代国际大都市",
+            "穿衣风格": "时尚前卫，融合东西方元素",
+            "文化建议": "着装可以时尚大胆",
+            "特别提示": {
+                "上午": "商务区适合正装",
+                "下午": "前卫时尚的日装",
+                "晚上": "潮流晚装",
+                "凌晨": "夜生活时尚层次"
+            },
+            "适合场所": "外滩、豫园、田子坊",
+            "禁忌": "特殊场合避免过于休闲的着装"
+        }
+    }
+
+    default_city = {
+        "城市特点": "请查看当地特点",
+        "穿衣风格": "建议了解当地穿衣习惯",
+        "文化建议": "注意当地文化",
+        "特别提示": {
+            "上午": "查看当地早晨天气",
+            "下午": "了解当地下午情况",
+            "晚上": "了解当地晚间活动",
+            "凌晨": "了解当地夜间情况"
+        },
+        "适合场所": "请查看当地旅游信息",
+        "禁忌": "注意着装得体"
+    }
+
+    return base_clothing, time_specific_tips, city_specific, default_city
+
+
+def _basic_tables():
+    """Build the crewAI ``get_fashion`` tables as plain dict literals.
+
+    Returns ``(base_clothing, city_specific, default_city)`` where ``base_clothing``
+    is keyed by temperature band.
+    """
+    # Basic advice based on temperature
+    base_clothing = {
+        "cold": {
+            "Coat": "Thick coat or down jacket",
+            "Top": "Warm sweater or high-neck knitwear",
+            "Bottom": "Warm trousers",
+            "Accessories": "Scarf, hat, and gloves",
+            "Shoes": "Waterproof and warm boots"
+        },
+        "mild": {
+            "Coat": "Light jacket or windbreaker",
+            "Top": "Long-sleeved shirt or sweater",
+            "Bottom": "Casual trousers",
+            "Accessories": "Scarf (may be needed in the morning and evening)",
+            "Shoes": "Comfortable sneakers or casual shoes"
+        },
+        "warm": {
+            "Coat": "Optional lightweight sun protection jacket",
+            "Top": "Short-sleeved or lightweight long-sleeved",
+            "Bottom": "Lightweight trousers or shorts",
+            "Accessories": "Sun hat and sunglasses",
+            "Shoes": "Sandals or breathable sneakers"
+        },
+    }
+
+    # City-specific advice
+    city_specific = {
+        "Copenhagen": {
+            "City Characteristics": "Nordic fashion capital, minimalist style",
+            "Dressing Style": "Simple and elegant, mainly black, white, and gray",
+            "Cultural Advice": "Conservative attire, emphasizing environmental awareness",
+            "Special Tips": "Weather can be unpredictable; bring rain gear",
+            "Suitable Venues": "Design Museum, Nyhavn, The Little Mermaid",
+            "Taboos": "Avoid overly flashy outfits"
+        },
+        "Beijing": {
+            "City Characteristics": "Modern and traditional international metropolis",
+            "Dressing Style": "Elegant and practical",
+            "Cultural Advice": "Dress formally when visiting attractions",
+            "Special Tips": "Pay attention to air quality; prepare masks",
+            "Suitable Venues": "Forbidden City, Great Wall, Hutongs",
+            "Taboos": "Avoid revealing attire when visiting temples"
+        },
+        "Berlin": {
+            "City Characteristics": "Fusion of avant-garde art and historical culture",
+            "Dressing Style": "Individualized, street style is popular",
+            "Cultural Advice": "Dress can be bold and innovative",
+            "Special Tips": "Large temperature differences in spring and autumn; layer clothing",
+            "Suitable Venues": "Museum Island, Brandenburg Gate, East Side Gallery",
+            "Taboos": "Avoid inappropriate attire when visiting memorials"
+        },
+        "Paris": {
+            "City Characteristics": "Global fashion capital",
+            "Dressing Style": "Elegant and fashionable, emphasizing details",
+            "Cultural Advice": "Lean towards formal elegance",
+            "Special Tips": "High-end restaurants require formal attire",
+            "Suitable Venues": "Eiffel Tower, Louvre, Champs-Élysées",
+            "Taboos": "Avoid athletic wear in formal settings"
+        },
+        "Phuket": {
+            "City Characteristics": "Tropical island resort",
+            "Dressing Style": "Light and cool, vacation style",
+            "Cultural Advice": "Be mindful of Thai cultural etiquette",
+            "Special Tips": "Sunscreen and insect repellent are essential",
+            "Suitable Venues": "Beaches, temples, night markets",
+            "Taboos": "Dress appropriately when visiting temples"
+        },
+        "Shanghai": {
+            "City Characteristics": "Modern international metropolis",
+            "Dressing Style": "Fashionable and avant-garde, blending Eastern and Western elements",
+            "Cultural Advice": "Dress can be fashionable and bold",
+            "Special Tips": "Carry rain gear and check weather forecasts",
+            "Suitable Venues": "The Bund, Yu Garden, Tianzifang",
+            "Taboos": "Avoid overly casual attire in special occasions"
+        }
+    }
+
+    default_city = {
+        "City Characteristics": "Please check local characteristics",
+        "Dressing Style": "Suggest checking local dressing habits",
+        "Cultural Advice": "Be mindful of local culture",
+        "Special Tips": "Suggest checking local weather forecasts",
+        "Suitable Venues": "Please check local tourist information",
+        "Taboos": "Be mindful of dressing appropriately"
+    }
+
+    return base_clothing, city_specific, default_city
+
+
+def parse_temperature(temperature) -> float:
+    """Parse "18", "18C", "18°C" or "18℃" (or a number) as degrees Celsius."""
+    if isinstance(temperature, (int, float)):
+        return float(temperature)
+    return float(temperature.strip().removesuffix("℃").removesuffix("C").removesuffix("°"))
+
+
+class UnknownTimePeriod(ValueError):
+    def __init__(self, time_period: str):
+        super().__init__(f"未知时间段：{time_period}。可选：{'、'.join(TIME_PERIODS)}")
+        self.time_period = time_period
+
+
+def check_time_period(time_period: str) -> str:
+    """Return ``time_period``, or raise ``UnknownTimePeriod`` if it is not one of ``TIME_PERIODS``."""
+    if time_period not in TEMP_ADJUSTMENTS:
+        raise UnknownTimePeriod(time_period)
+    return time_period
+
+
+def feels_like(temp_value: float, time_period: str) -> float:
+    return temp_value + TEMP_ADJUSTMENTS.get(time_period, 0)
+
+
+def age_group(age: str) -> str:
+    try:
+        age_num = int(age)
+    except ValueError:
+        return "adult"
+    if age_num < 18:
+        return "teen"
+    elif age_num < 30:
+        return "young"
+    elif age_num < 50:
+        return "adult"
+    return "senior"
+
+
+def temperature_band(adjusted_temp: float) -> str:
+    return TEMPERATURE_BANDS[bisect_right(BAND_THRESHOLDS, adjusted_temp)]
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def _field(key: str, value) -> str:
+    """Serialize one top-level ``"key": value`` member at nesting depth 1."""
+    return f"  {_dumps(key)}: " + _dumps(value).replace("\n", "\n  ")
+
+
+def _build_section_index():
+    """Index every section value of the detailed document by (section, *lookup key)."""
+    base_clothing, time_specific_tips, city_specific, default_city = _detailed_tables()
+    index = {}
+    for band in TEMPERATURE_BANDS:
+        for style in STYLES:
+            index["Clothing Recommendations", band, style] = base_clothing[band][style]
+    for period in TIME_PERIODS:
+        for group in AGE_GROUPS:
+            index["Time-Specific Advice", period, group] = time_specific_tips[period][group]
+    for city, info in {**city_specific, None: default_city}.items():
+        index["City-Specific Advice", city] = info
+    return MappingProxyType(index), frozenset(city_specific)
+
+
+def _build_basic_index():
+    base_clothing, city_specific, default_city = _basic_tables()
+    cities = {**city_specific, None: default_city}
+    return MappingProxyType({
+        (band, city): ",\n".join((
+            _field("Basic Clothing Advice", base_clothing[band]),
+            _field("City-Specific Advice", info),
+        ))
+        for band in TEMPERATURE_BANDS
+        for city, info in cities.items()
+    })
+
+
+def _chunk(key: str, value) -> str:
+    return json.dumps({key: value}, ensure_ascii=False)
+
+
+# Section values are shared between calls: treat them as read-only. Each one is
+# also pre-serialized as a streaming chunk and as a member of the full document.
+SECTION_VALUES, CITIES = _build_section_index()
+SECTION_CHUNKS = MappingProxyType({key: _chunk(key[0], value) for key, value in SECTION_VALUES.items()})
+SECTION_FIELDS = MappingProxyType({key: _field(key[0], value) for key, value in SECTION_VALUES.items()})
+BASIC_FRAGMENTS = _build_basic_index()
+
+# Sections of the detailed document, in the order ``detailed_sections`` emits
+# them after the header (location, time period, temperature, user profile).
+DETAILED_SECTIONS = ("Clothing Recommendations", "Time-Specific Advice", "City-Specific Advice", "天气提醒")
+
+
+class Recommendation(NamedTuple):
+    feels_like: float
+    band: str
+    age_group: str
+    style: str  # normalized: unknown styles fall back to DEFAULT_STYLE
+    time_period: str
+    city: str | None  # None for cities without specific advice
+
+
+def recommend(temperature, time_period: str = "下午", age: str = "25", style: str = DEFAULT_STYLE,
+              location: str | None = None) -> Recommendation:
+    """Classify a single request; ``recommend_many`` does the same for arrays."""
+    adjusted_temp = feels_like(parse_temperature(temperature), time_period)
+    return Recommendation(
+        adjusted_temp,
+        temperature_band(adjusted_temp),
+        age_group(age),
+        style if style in STYLES else DEFAULT_STYLE,
+        time_period,
+        location if location in CITIES else None,
+    )
+
+
+def _column(values, n):
+    """Broadcast a scalar to ``n`` items; pass sequences through."""
+    if isinstance(values, (str, int, float)):
+        return [values] * n
+    values = list(values)
+    if len(values) != n:
+        raise ValueError(f"expected {n} values, got {len(values)}")
+    return values
+
+
+def recommend_many(temperatures, time_periods="下午", ages="25", styles=DEFAULT_STYLE, locations=None):
+    """Classify whole arrays of (temperature, time period, age, style, location) at once.
+
+    Scalars are broadcast to the length of ``temperatures``. Parsing, band and
+    age-group classification run as flat passes over the columns with repeated
+    values memoized, so the per-item cost is a few dict lookups.
+    """
+    temperatures = list(temperatures)
+    n = len(temperatures)
+    periods = _column(time_periods, n)
+    ages = _column(ages, n)
+    # Inputs repeat heavily (a handful of cities, periods and ages), so each
+    # distinct value is parsed/classified once and the columns are mapped.
+    parsed = {t: parse_temperature(t) for t in set(temperatures)}
+    group_of = {a: age_group(a) for a in set(ages)}
+    adjusted = [parsed[t] + TEMP_ADJUSTMENTS.get(p, 0) for t, p in zip(temperatures, periods)]
+    band_of = {t: TEMPERATURE_BANDS[bisect_right(BAND_THRESHOLDS, t)] for t in set(adjusted)}
+    styles = [s if s in STYLES else DEFAULT_STYLE for s in _column(styles, n)]
+    cities = ([None] * n if locations is None
+              else [c if c in CITIES else None for c in _column(locations, n)])
+    return list(map(Recommendation._make, zip(
+        adjusted, map(band_of.__getitem__, adjusted), map(group_of.__getitem__, ages),
+        styles, periods, cities)))
+
+
+def _detailed_document(recommendation: Recommendation, location: str, temperature: str,
+                       style: str, description: str):
+    """Lay out the detailed document for a classified request.
+
+    Returns ``(header, section_keys, reminder)``: the per-request members, the
+    ``SECTION_*`` keys of the cached sections and the "天气提醒" text.
+    ``render_detailed``, ``detailed_sections`` and ``detailed_advice`` only
+    serialize this layout differently. Raises ``UnknownTimePeriod`` before
+    anything is rendered.
+    """
+    rec = recommendation
+    check_time_period(rec.time_period)
+    temperature_info = {"Actual": temperature, "Feels Like": f"{rec.feels_like}C"}
+    if description:
+        temperature_info["Description"] = description
+    header = {
+        "Location": location,
+        "Time Period": rec.time_period,
+        "Temperature": temperature_info,
+        "User Profile": {"Age Group": rec.age_group, "Style Preference": style},
+    }
+    section_keys = (
+        ("Clothing Recommendations", rec.band, rec.style),
+        ("Time-Specific Advice", rec.time_period, rec.age_group),
+        ("City-Specific Advice", rec.city),
+    )
+    reminder = f"当前{rec.time_period}体感温度{rec.feels_like}度，{DETAILED_REMINDERS[rec.band]}"
+    return header, section_keys, reminder
+
+
+def _member(key: str, value) -> str:
+    """``_field`` for a string or a flat dict of strings, without the (slow) indenting encoder."""
+    if isinstance(value, str):
+        return f"  {encode_basestring(key)}: {encode_basestring(value)}"
+    members = ",\n    ".join([f"{encode_basestring(k)}: {encode_basestring(v)}" for k, v in value.items()])
+    return f"  {encode_basestring(key)}: {{\n    {members}\n  }}"
+
+
+def _render(members) -> str:
+    """Join serialized top-level members into an indented JSON object."""
+    return "{\n" + ",\n".join(members) + "\n}"
+
+
+def detailed_advice_for(recommendation: Recommendation, location: str, temperature: str,
+                        style: str = DEFAULT_STYLE, description: str = "") -> dict:
+    """``detailed_advice`` for a request already classified by ``recommend``/``recommend_many``.
+
+    ``style`` is the requested style as given, shown under "User Profile".
+    """
+    header, section_keys, reminder = _detailed_document(recommendation, location, temperature, style, description)
+    for key in section_keys:
+        header[key[0]] = SECTION_VALUES[key]
+    header["天气提醒"] = reminder
+    return header
+
+
+def render_detailed(location: str, temperature: str, time_period: str = "下午",
+                    age: str = "25", style: str = "休闲", description: str = "") -> str:
+    """Return the ``get_fashion`` JSON document assembled from cached fragments.
+
+    The output is identical to ``json.dumps(response, ensure_ascii=False, indent=2)``
+    of the response dict the MCP tool used to build per call. A non-empty
+    weather ``description`` is added to the "Temperature" section.
+    """
+    header, section_keys, reminder = _detailed_document(
+        recommend(temperature, time_period, age, style, location), location, temperature, style, description)
+    return _render((
+        *map(_member, header, header.values()),
+        *map(SECTION_FIELDS.__getitem__, section_keys),
+        _member("天气提醒", reminder),
+    ))
+
+
+def detailed_advice(location: str, temperature: str, time_period: str = "下午",
+                    age: str = "25", style: str = "休闲", description: str = "") -> dict:
+    """Return the ``render_detailed`` document as a dict, for callers that
+    serialize it themselves. Nested values are shared and must not be mutated.
+    """
+    return detailed_advice_for(recommend(temperature, time_period, age, style, location),
+                               location, temperature, style, description)
+
+
+def detailed_sections(location: str, temperature: str, time_period: str = "下午",
+                      age: str = "25", style: str = "休闲", description: str = ""):
+    """Yield the ``render_detailed`` document as compact single-line JSON objects.
+
+    The first chunk carries "Location", "Time Period", "Temperature" and
+    "User Profile"; each following chunk holds one of ``DETAILED_SECTIONS``.
+    Merging the decoded chunks in order gives ``json.loads(render_detailed(...))``.
+    """
+    header, section_keys, reminder = _detailed_document(
+        recommend(temperature, time_period, age, style, location), location, temperature, style, description)
+    yield json.dumps(header, ensure_ascii=False)
+    yield from map(SECTION_CHUNKS.__getitem__, section_keys)
+    yield _chunk("天气提醒", reminder)
+
+
+def packing_list(clothing) -> dict:
+    """Merge per-stop clothing recommendations into one list per item, in trip order.
+
+    ``clothing`` yields {item: recommendation} dicts, e.g. the "Clothing
+    Recommendations" of each leg of an itinerary; repeated advice is listed once.
+    """
+    packing = {}
+    for recommendations in clothing:
+        for item, advice in recommendations.items():
+            entries = packing.setdefault(item, [])
+            if advice not in entries:
+                entries.append(advice)
+    return packing
+
+
+def render_basic(location: str, weather: str, temperature: str) -> str:
+    """Return the crewAI ``get_fashion`` JSON document assembled from cached fragments.
+
+    ``weather`` is accepted for interface parity; the advice only depends on the
+    temperature band and city.
+    """
+    band = temperature_band(parse_temperature(temperature))
+    static = BASIC_FRAGMENTS.get((band, location)) or BASIC_FRAGMENTS[band, None]
+    reminder = f"Current temperature {temperature}, {BASIC_REMINDERS[band]}"
+    return _render((
+        _member("Location", location),
+        _member("Temperature", temperature),
+        static,
+        _member("Weather Reminder", reminder),
+    ))
@@ -0,0 +1,112 @@
+"""Admission control for async handlers: concurrency limits, bounded queues, deadlines.
+
+    limiter = ConcurrencyLimiter("get_fashion", limit=32, max_queue=64)
+    async with limiter.admit(deadline):
+        ...
+
+At most ``limit`` calls run at once and up to ``max_queue`` more wait in FIFO
+order. A call that arrives when the queue is full is rejected at once with
+``Overloaded("queue_full")``. A waiter whose deadline passes before it gets a
+slot, or an admitted call still running at its deadline, fails with
+``Overloaded("deadline_exceeded")``. Deadlines are
+``time.monotonic()`` values, the clock asyncio's loop uses; ``deadline_after``
+turns a client's remaining-time budget into one.
+"""
+import asyncio
+import collections
+import time
+from contextlib import asynccontextmanager
+
+
+class Overloaded(Exception):
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"{name}: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+def deadline_after(timeout_ms) -> float | None:
+    """The deadline for a remaining budget of ``timeout_ms`` (None or invalid: no deadline)."""
+    try:
+        timeout_ms = float(timeout_ms)
+    except (TypeError, ValueError):
+        return None
+    return time.monotonic() + max(timeout_ms, 0.0) / 1000
+
+
+def parse_limits(spec: str) -> dict:
+    """"get_fashion=8:16,/fashion-advice=32" -> {"get_fashion": (8, 16), "/fashion-advice": (32, None)}"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.rpartition("=")
+        limit, _, queue = value.partition(":")
+        limits[name] = (int(limit), int(queue) if queue else None)
+    return limits
+
+
+class ConcurrencyLimiter:
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.rejected = collections.Counter()  # reason -> count
+        self._waiters = collections.deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, deadline: float | None = None):
+        if deadline is not None and deadline <= time.monotonic():
+            self._reject("deadline_exceeded")
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout_at(deadline):
+                await waiter
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # granted a slot just as the wait ended
+            if isinstance(e, TimeoutError):
+                self._reject("deadline_exceeded")
+            raise
+        finally:
+            # A timeout or cancellation has already cancelled the future; it
+            # must still leave the queue or it counts against max_queue.
+            if not waiter.done():
+                waiter.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self):
+        # Hand the slot straight to the oldest live waiter
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        raise Overloaded(self.name, reason)
+
+    @asynccontextmanager
+    async def admit(self, deadline: float | None = None):
+        """Hold a slot for the block, which must finish by ``deadline``."""
+        await self.acquire(deadline)
+        try:
+            async with asyncio.timeout_at(deadline) as timeout:
+                yield
+        except TimeoutError:
+            if timeout.expired():
+                self._reject("deadline_exceeded")
+            raise
+        finally:
+            self.release()
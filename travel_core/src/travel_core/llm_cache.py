@@ -0,0 +1,213 @@
+"""Opt-in on-disk cache for LLM responses.
+
+Agents resend near-identical prompts ("Use the get_weather tool to get weather
+information for Paris"), and each one is a full Bedrock round-trip.
+ResponseCache stores responses in SQLite, keyed by the model, the normalized
+prompt (Unicode NFKC, whitespace collapsed), the tool schemas offered to the
+model and the sampling parameters. Entries expire after ``ttl`` seconds. Once
+the stored responses exceed ``max_bytes``, the least recently used ones are
+evicted. Matching is exact after normalization, so a reworded prompt is a miss.
+
+Both demos use it when LLM_CACHE_PATH is set (LLM_CACHE_TTL and
+LLM_CACHE_MAX_BYTES tune it):
+
+    LLM_CACHE_PATH=.llm_cache.sqlite python client.py
+
+``langchain_cache()`` adapts a ResponseCache to langchain's ``BaseCache`` for
+``ChatBedrockConverse(cache=...)``. crewAI's ``BedrockLLM`` uses the cache
+directly.
+"""
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def _canonical(value):
+    if isinstance(value, str):
+        return normalize_prompt(value)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def make_key(model: str, prompt, tools=None, **params) -> str:
+    """Cache key for one model call.
+
+    ``prompt`` is text or a list of chat messages, ``tools`` the tool schemas
+    offered to the model and ``params`` anything else that changes the answer
+    (temperature, stop sequences, ...).
+    """
+    payload = {"model": model, "prompt": _canonical(prompt), "tools": _canonical(tools or []), "params": params}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response store with a TTL and a size cap; safe to share between threads."""
+
+    def __init__(self, path: str, ttl: float = 86400.0, max_bytes: int = 64 * 1024 * 1024, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses ("
+                         "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                         "created REAL NOT NULL, accessed REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> str | None:
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, value, size, now, now))
+            self._evict_locked()
+
+    def _evict_locked(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed, freed = [], 0
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            doomed.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def get_or_call(self, key: str, call) -> str:
+        """The cached response for ``key``, else ``call()``'s result (which is stored)."""
+        value = self.get(key)
+        if value is None:
+            value = call()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+@functools.cache
+def get_cache() -> ResponseCache | None:
+    """The process-wide cache configured by LLM_CACHE_PATH, or None when caching is off."""
+    path = os.getenv("LLM_CACHE_PATH")
+    if not path:
+        return None
+    return ResponseCache(
+        path,
+        ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+        max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    )
+
+
+# Per-call fields langchain serializes with every message; they never change the answer
+_VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+def _stable_messages(node):
+    if isinstance(node, list):
+        return [_stable_messages(item) for item in node]
+    if isinstance(node, dict):
+        kwargs = node.get("kwargs")
+        if isinstance(kwargs, dict):
+            node = {**node, "kwargs": {k: v for k, v in kwargs.items() if k not in _VOLATILE_FIELDS}}
+        return {k: _stable_messages(v) for k, v in node.items()}
+    return node
+
+
+def langchain_cache(cache: ResponseCache):
+    """A langchain ``BaseCache`` backed by ``cache`` (needs langchain-core)."""
+    return _langchain_cache_class()(cache)
+
+
+@functools.cache
+def _langchain_cache_class():
+    from langchain_core.caches import BaseCache
+    from langchain_core.messages import message_to_dict, messages_from_dict
+    from langchain_core.outputs import ChatGeneration
+
+    class LangChainResponseCache(BaseCache):
+        # For chat models: langchain passes the serialized messages as ``prompt``
+        # and the model id, parameters and bound tool schemas as ``llm_string``.
+        def __init__(self, cache: ResponseCache):
+            self.cache = cache
+
+        @staticmethod
+        def _key(prompt, llm_string):
+            try:
+                prompt = _stable_messages(json.loads(prompt))
+            except ValueError:
+                pass
+            return make_key(llm_string, prompt)
+
+        def lookup(self, prompt, llm_string):
+            value = self.cache.get(self._key(prompt, llm_string))
+            if value is None:
+                return None
+            return [ChatGeneration(message=message) for message in messages_from_dict(json.loads(value))]
+
+        def update(self, prompt, llm_string, return_val):
+            messages = [message_to_dict(generation.message) for generation in return_val]
+            self.cache.put(self._key(prompt, llm_string), json.dumps(messages, ensure_ascii=False))
+
+        def clear(self, **kwargs):
+            self.cache.clear()
+
+    return LangChainResponseCache
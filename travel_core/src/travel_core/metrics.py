@@ -0,0 +1,234 @@
+"""Prometheus-style metrics with near-lock-free recording.
+
+Counters, gauges and histograms keep one cell per writer thread, keyed by
+``threading.get_ident()``. A thread only ever updates its own cell, so the
+hot path is a dict lookup and a few additions with no lock. Scrapes add
+the cells up. Under the GIL a scrape can see a histogram cell part-way
+through an update: for one sample the count is already incremented but the
+sum is not. That is fine for monitoring. A lock is only taken when a labelled
+child is created for the first time. A thread's cell is created without one:
+the dict insert is atomic under the GIL and no other thread uses that key.
+
+    REQUESTS = Counter("app_requests_total", "Requests handled", ["route"])
+    REQUESTS.labels("/fashion-advice").inc()
+    LATENCY = Histogram("app_request_duration_seconds", "Latency", ["route"])
+    with LATENCY.labels("/fashion-advice").time():
+        ...
+    body = REGISTRY.exposition()   # text format 0.0.4
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import get_ident
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; tuned for in-process tool calls (sub-millisecond) up to model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"metric {metric.name} is already registered")
+            self._metrics.append(metric)
+        return metric
+
+    def exposition(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: Registry | None = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}  # normalized label values -> child, for exposition
+        self._lookup = {}  # label values as passed to labels() -> child
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values):
+        """The child for one combination of label values (created on first use)."""
+        child = self._lookup.get(values)
+        if child is None:
+            child = self._add_child(values)
+        return child
+
+    def _add_child(self, values):
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        with self._lock:
+            child = self._children.setdefault(key, self._new_child())
+            self._lookup[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def __getattr__(self, name):
+        # Unlabelled metrics proxy inc()/observe()/... to their single child
+        if not self.__dict__.get("labelnames") and "_children" in self.__dict__:
+            return getattr(self._children[()], name)
+        raise AttributeError(name)
+
+    def samples(self):
+        for key, child in list(self._children.items()):
+            yield from child.samples(self.name, self.labelnames, key)
+
+
+class _Cells:
+    """Per-thread cells: each thread only writes the cell it created."""
+    __slots__ = ("_cells", "_factory", "_function")
+
+    def __init__(self, factory):
+        self._cells = {}
+        self._factory = factory
+        self._function = None
+
+    def cell(self):
+        # No lock: only this thread inserts its key, and the GIL keeps the insert atomic
+        cell = self._cells.get(get_ident())
+        if cell is None:
+            cell = self._cells[get_ident()] = self._factory()
+        return cell
+
+    def all(self):
+        return list(self._cells.values())
+
+
+class _ValueChild(_Cells):
+    def __init__(self):
+        super().__init__(lambda: [0])
+
+    def inc(self, amount=1):
+        # cell() inlined: this is the hot path
+        cell = self._cells.get(get_ident())
+        if cell is None:
+            cell = self.cell()
+        cell[0] += amount
+
+    def set_function(self, function):
+        """Report ``function()`` at scrape time instead of the recorded value."""
+        self._function = function
+
+    def get(self):
+        if self._function is not None:
+            return self._function()
+        return sum(cell[0] for cell in self.all())
+
+    def samples(self, name, labelnames, key):
+        yield f"{name}{_format_labels(labelnames, key)} {_format_value(self.get())}"
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+
+class _GaugeChild(_ValueChild):
+    def dec(self, amount=1):
+        cell = self._cells.get(get_ident())
+        if cell is None:
+            cell = self.cell()
+        cell[0] -= amount
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class Gauge(_Metric):
+    """Gauge built from per-thread deltas; ``set`` is not supported, use
+    ``set_function`` for values computed at scrape time."""
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class _HistogramChild(_Cells):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # [count per bucket..., count in +Inf, sum]
+        super().__init__(lambda: [0] * (len(buckets) + 1) + [0.0])
+
+    def observe(self, value: float):
+        cell = self._cells.get(get_ident())
+        if cell is None:
+            cell = self.cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self, name, labelnames, key):
+        totals = [sum(column) for column in zip(*self.all())] or [0] * (len(self.buckets) + 2)
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), totals):
+            cumulative += count
+            yield f"{name}_bucket{_format_labels(labelnames, key, [('le', _format_value(bound))])} {cumulative}"
+        yield f"{name}_sum{_format_labels(labelnames, key)} {_format_value(float(totals[-1]))}"
+        yield f"{name}_count{_format_labels(labelnames, key)} {cumulative}"
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
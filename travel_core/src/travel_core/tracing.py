@@ -0,0 +1,396 @@
+"""Lightweight tracing with OpenTelemetry-compatible spans.
+
+Spans carry W3C trace/span ids, a parent, a kind, attributes and a status.
+Finished spans are written to a local JSON-lines file in the OTLP/JSON layout
+(one ``{"resourceSpans": [...]}`` export request per line), so the file can
+be read by the OpenTelemetry Collector's ``otlpjsonfile`` receiver or
+summarized offline:
+
+    TRAVEL_TRACE_FILE=traces.jsonl python server.py
+    python -m travel_core.tracing traces.jsonl
+
+Tracing is off unless ``TRAVEL_TRACE_FILE`` is set (or ``configure`` is
+called). When it is off, ``span()`` yields a shared no-op span and
+``traced`` functions run with one extra attribute check.
+
+    tracer = get_tracer()
+
+    with tracer.span("mcp.list_tools", server="weather_fashion") as span:
+        ...
+        span.add_tokens(input_tokens=120, output_tokens=40)
+
+    @tracer.traced("tool.get_weather")
+    async def get_weather(location): ...
+"""
+import argparse
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+_SPAN_KINDS = {
+    "internal": "SPAN_KIND_INTERNAL",
+    "server": "SPAN_KIND_SERVER",
+    "client": "SPAN_KIND_CLIENT",
+}
+
+_current_span = contextvars.ContextVar("travel_core_span", default=None)
+
+
+def current_span():
+    """The active span in this context, or ``None``."""
+    return _current_span.get()
+
+
+def activate(span):
+    """Make ``span`` current in this context; returns a token for ``deactivate``.
+
+    For callback-style hooks where a ``with`` block cannot span start and end.
+    """
+    return _current_span.set(span)
+
+
+def deactivate(token):
+    try:
+        _current_span.reset(token)
+    except ValueError:  # token from another context (e.g. a different thread)
+        pass
+
+
+def _attribute_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: dict) -> list:
+    return [{"key": key, "value": _attribute_value(value)} for key, value in attributes.items()]
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "events", "error", "_tracer")
+
+    def __init__(self, tracer, name, kind="internal", parent=None, trace_id=None, parent_id=None,
+                 attributes=None):
+        self._tracer = tracer
+        self.name = name
+        self.kind = kind
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        self.trace_id = trace_id or f"{random.getrandbits(128):032x}"
+        self.parent_id = parent_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_tokens(self, input_tokens: int = 0, output_tokens: int = 0):
+        """Accumulate model token usage (OpenTelemetry GenAI attribute names)."""
+        attrs = self.attributes
+        attrs["gen_ai.usage.input_tokens"] = attrs.get("gen_ai.usage.input_tokens", 0) + (input_tokens or 0)
+        attrs["gen_ai.usage.output_tokens"] = attrs.get("gen_ai.usage.output_tokens", 0) + (output_tokens or 0)
+
+    def add_event(self, name: str, **attributes):
+        self.events.append((time.time_ns(), name, attributes))
+
+    def record_exception(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+        self.add_event("exception", **{"exception.type": type(error).__name__, "exception.message": str(error)})
+
+    @property
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` header value for propagating this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self._tracer._export(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _SPAN_KINDS.get(self.kind, "SPAN_KIND_INTERNAL"),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _attributes(self.attributes),
+            "status": ({"code": "STATUS_CODE_ERROR", "message": self.error} if self.error
+                       else {"code": "STATUS_CODE_OK"}),
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.events:
+            span["events"] = [
+                {"timeUnixNano": str(ts), "name": name, "attributes": _attributes(attrs)}
+                for ts, name, attrs in self.events
+            ]
+        return span
+
+
+class _NoopSpan:
+    """Stand-in yielded while tracing is disabled."""
+    trace_id = span_id = parent_id = None
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def add_tokens(self, input_tokens=0, output_tokens=0):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def record_exception(self, error):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class FileExporter:
+    """Appends finished spans to a JSON-lines file in OTLP/JSON layout.
+
+    Spans are buffered and written in batches of ``batch_size``, at least every
+    ``flush_interval`` seconds while spans keep finishing, and at exit.
+    """
+
+    def __init__(self, path: str, service_name: str, batch_size: int = 64, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._resource = {"attributes": _attributes({"service.name": service_name})}
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._file = open(path, "a", encoding="utf-8")
+        atexit.register(self.close)
+
+    def export(self, span: Span):
+        with self._lock:
+            self._buffer.append(span)
+            if (len(self._buffer) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer or self._file.closed:
+            return
+        batch, self._buffer = self._buffer, []
+        self._file.write(json.dumps({"resourceSpans": [{
+            "resource": self._resource,
+            "scopeSpans": [{"scope": {"name": "travel_core"}, "spans": [s.to_otlp() for s in batch]}],
+        }]}, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._file.close()
+
+
+class Tracer:
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def _export(self, span: Span):
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def start_span(self, name: str, kind: str = "internal", parent=None, traceparent: str | None = None,
+                   **attributes):
+        """Start a span without activating it; the caller must ``end()`` it.
+
+        The parent is ``parent``, else the remote span in a W3C ``traceparent``
+        header, else the current span.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        trace_id = parent_id = None
+        if parent is None and traceparent:
+            parts = traceparent.split("-")
+            if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                trace_id, parent_id = parts[1], parts[2]
+        if parent is None and trace_id is None:
+            parent = _current_span.get()
+        if parent is NOOP_SPAN:
+            parent = None
+        return Span(self, name, kind, parent, trace_id, parent_id, attributes)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", parent=None, traceparent: str | None = None,
+             **attributes):
+        """Run the block inside a new span that is current for its duration."""
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        span = self.start_span(name, kind, parent, traceparent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def traced(self, name: str | None = None, **attributes):
+        """Decorator: run each call of a sync or async function in a span."""
+        def decorate(fn):
+            span_name = name or fn.__qualname__
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await fn(*args, **kwargs)
+                    with self.span(span_name, **attributes):
+                        return await fn(*args, **kwargs)
+            else:
+                @functools.wraps(fn)
+                def wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return fn(*args, **kwargs)
+                    with self.span(span_name, **attributes):
+                        return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+
+class TraceMiddleware:
+    """ASGI middleware that runs each HTTP request in a server span.
+
+    Honours an incoming ``traceparent`` header and records the method, path and
+    response status.
+    """
+
+    def __init__(self, app, tracer: Tracer | None = None):
+        self.app = app
+        self.tracer = tracer or get_tracer()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            return await self.app(scope, receive, send)
+        traceparent = dict(scope.get("headers") or ()).get(b"traceparent")
+        with self.tracer.span(
+            f"{scope['method']} {scope['path']}",
+            kind="server",
+            traceparent=traceparent.decode("latin-1") if traceparent else None,
+            **{"http.request.method": scope["method"], "url.path": scope["path"]},
+        ) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+_tracer = Tracer()
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def _configure_locked(path, service_name):
+    global _configured
+    if _tracer.exporter is not None:
+        _tracer.exporter.close()
+    service_name = service_name or os.getenv("OTEL_SERVICE_NAME", "travel-demo")
+    _tracer.exporter = FileExporter(path, service_name) if path else None
+    _configured = True
+
+
+def configure(path: str | None = None, service_name: str | None = None) -> Tracer:
+    """Point the process-wide tracer at ``path`` (``None`` disables export)."""
+    with _configure_lock:
+        _configure_locked(path, service_name)
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer, configured from ``TRAVEL_TRACE_FILE`` on first use."""
+    if not _configured:
+        with _configure_lock:
+            if not _configured:
+                _configure_locked(os.getenv("TRAVEL_TRACE_FILE"), None)
+    return _tracer
+
+
+def summarize(path: str) -> dict:
+    """Per span name: count, errors, p50/p95/max duration and token totals."""
+    durations, errors, tokens = {}, {}, {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    for span in scope["spans"]:
+                        name = span["name"]
+                        ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+                        durations.setdefault(name, []).append(ms)
+                        errors[name] = errors.get(name, 0) + (span["status"]["code"] == "STATUS_CODE_ERROR")
+                        for attribute in span["attributes"]:
+                            if attribute["key"].startswith("gen_ai.usage."):
+                                key = (name, attribute["key"].rsplit(".", 1)[-1])
+                                tokens[key] = tokens.get(key, 0) + int(attribute["value"]["intValue"])
+    report = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        report[name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "p50_ms": round(values[len(values) // 2], 3),
+            "p95_ms": round(values[min(len(values) - 1, int(0.95 * len(values)))], 3),
+            "max_ms": round(values[-1], 3),
+            "total_ms": round(sum(values), 3),
+        }
+        for (span_name, kind), count in tokens.items():
+            if span_name == name:
+                report[name][kind] = count
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a travel_core trace file per span name")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+    print(json.dumps(summarize(args.path), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
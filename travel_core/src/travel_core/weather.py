@@ -0,0 +1,164 @@
+"""Pluggable weather providers with an in-process cache.
+
+``WeatherProvider`` is the interface a real weather feed implements.
+``CachedWeatherProvider`` wraps any provider with:
+
+- a TTL cache: entries are served without an upstream call for ``ttl`` seconds;
+- single-flight coalescing: concurrent lookups for the same location share
+  one upstream fetch;
+- stale-while-revalidate: for ``stale_ttl`` seconds after expiry the old entry
+  is returned at once while a single background fetch refreshes it.
+
+    provider = CachedWeatherProvider(StaticWeatherProvider({"Paris": (22, "Cloudy")}))
+    report = await provider.get("Paris")
+"""
+import asyncio
+import importlib
+import random
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WeatherReport:
+    location: str
+    temperature: float  # degrees Celsius
+    description: str
+
+
+class UnknownLocationError(LookupError):
+    def __init__(self, location: str, available=()):
+        super().__init__(location)
+        self.location = location
+        self.available = tuple(available)
+
+
+class WeatherProvider:
+    """Interface for weather sources."""
+
+    # Locations the provider knows about, if it can enumerate them
+    cities: tuple = ()
+
+    async def fetch(self, location: str) -> WeatherReport:
+        """Return the current weather, or raise ``UnknownLocationError``."""
+        raise NotImplementedError
+
+
+class StaticWeatherProvider(WeatherProvider):
+    """Serves a fixed ``{location: (temperature, description)}`` table."""
+
+    def __init__(self, table: dict):
+        self._table = {
+            location: WeatherReport(location, float(temperature), description)
+            for location, (temperature, description) in table.items()
+        }
+        self.cities = tuple(self._table)
+
+    async def fetch(self, location: str) -> WeatherReport:
+        try:
+            return self._table[location]
+        except KeyError:
+            raise UnknownLocationError(location, self.cities) from None
+
+
+class FakeWeatherProvider(StaticWeatherProvider):
+    """``StaticWeatherProvider`` with injected upstream latency, for benchmarks."""
+
+    def __init__(self, table: dict, latency: float = 0.05, jitter: float = 0.0):
+        super().__init__(table)
+        self.latency = latency
+        self.jitter = jitter
+        self.fetches = 0
+
+    async def fetch(self, location: str) -> WeatherReport:
+        self.fetches += 1
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        return await super().fetch(location)
+
+
+@dataclass
+class _Entry:
+    report: WeatherReport
+    fresh_until: float
+    stale_until: float
+
+
+class CachedWeatherProvider(WeatherProvider):
+    def __init__(self, upstream: WeatherProvider, ttl: float = 300.0, stale_ttl: float = 3600.0,
+                 clock=time.monotonic):
+        self.upstream = upstream
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries = {}
+        self._inflight = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.upstream_fetches = 0
+        self.upstream_errors = 0
+
+    @property
+    def cities(self):
+        return self.upstream.cities
+
+    async def fetch(self, location: str) -> WeatherReport:
+        return await self.get(location)
+
+    async def get(self, location: str) -> WeatherReport:
+        entry = self._entries.get(location)
+        now = self._clock()
+        if entry is not None and now < entry.fresh_until:
+            self.hits += 1
+            return entry.report
+        if entry is not None and now < entry.stale_until:
+            self.stale_hits += 1
+            self._refresh(location)
+            return entry.report
+        self.misses += 1
+        return await asyncio.shield(self._refresh(location))
+
+    def _refresh(self, location: str) -> asyncio.Task:
+        """Start (or join) the single upstream fetch for ``location``."""
+        task = self._inflight.get(location)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        task = asyncio.ensure_future(self._fetch_upstream(location))
+        self._inflight[location] = task
+        task.add_done_callback(lambda _: self._inflight.pop(location, None))
+        # Background revalidations nobody awaits must not log "exception never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _fetch_upstream(self, location: str) -> WeatherReport:
+        self.upstream_fetches += 1
+        try:
+            report = await self.upstream.fetch(location)
+        except Exception:
+            self.upstream_errors += 1
+            raise
+        now = self._clock()
+        self._entries[location] = _Entry(report, now + self.ttl, now + self.ttl + self.stale_ttl)
+        return report
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "upstream_fetches": self.upstream_fetches,
+            "upstream_errors": self.upstream_errors,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def load_provider(spec: str) -> WeatherProvider:
+    """Instantiate a provider from a ``"package.module:factory"`` spec."""
+    module_name, _, attr = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory()